@@ -0,0 +1,220 @@
+########################################################################
+#
+# RACI
+#
+# A tool to create RACI responsibility assignment matricies.
+#
+# https://github.com/marjohloo/RACI
+#
+# Copyright 2022 Martin Looker
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################
+
+# Package imports
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Project imports
+from Matrix import *
+
+# Times the load, edit and export paths on generated charts and writes the
+# results as JSON, e.g.
+#
+#   python Bench.py --sizes 10x10,100x20 -o new.json
+#   python Bench.py --baseline old.json --threshold 1.25
+#
+# The headless Matrix model is always measured, --gui also drives a Raci
+# window (which needs a display, Xvfb is fine) for charts up to --gui-cells.
+# Adding, deleting and moving rows and columns and editing cells move the
+# window's cells rather than a Matrix, so they are only measured with --gui
+# (raise --gui-cells to include the larger sizes).
+
+BENCH_SIZES  = "10x10,100x20,500x100,2000x500"
+BENCH_FILLS  = {"dense" : 1.0, "sparse" : 0.05}
+BENCH_REPEAT = 3
+BENCH_CELLS  = 20000
+# Operations quicker than this are too noisy to report as regressions
+BENCH_FLOOR  = 0.001
+
+def generate(rows, cols, fill, seed=0):
+    # Chart with rows x cols data cells, fill is the fraction given a role
+    rand = random.Random(seed)
+    roles = Scheme.get().roles[1:]
+    data = [["TITLE"] + [f'Person {col}' for col in range(1, cols+1)]]
+    for row in range(1, rows+1):
+        values = [f'Task {row}']
+        for col in range(cols):
+            if rand.random() < fill:
+                values.append(rand.choice(roles))
+            else:
+                values.append("")
+        data.append(values)
+    return Matrix(f'Benchmark {rows}x{cols}', data)
+
+def tsv(matrix):
+    # The chart as copied from a spreadsheet
+    return "\r\n".join("\t".join(values) for values in matrix.data) + "\r\n"
+
+class Bench:
+
+    def __init__(self, folder, repeat=BENCH_REPEAT, memory=True):
+        self.folder  = folder
+        self.repeat  = repeat
+        self.memory  = memory
+        self.metrics = Metrics(filename="")
+        self.results = []
+
+    def measure(self, mode, size, fill, op, setup, run):
+        # Best time of several runs, then peak memory of one more
+        seconds = None
+        for _ in range(self.repeat):
+            target = setup()
+            start = time.perf_counter()
+            run(target)
+            elapsed = time.perf_counter() - start
+            if seconds == None or elapsed < seconds:
+                seconds = elapsed
+        peak = None
+        if self.memory:
+            target = setup()
+            tracemalloc.start()
+            run(target)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        result = {"mode" : mode, "size" : size, "fill" : fill, "op" : op, "seconds" : seconds, "peak_bytes" : peak}
+        self.results.append(result)
+        print(f'{mode:8} {size:>10} {fill:6} {op:18} {seconds*1000:10.2f} ms', file=sys.stderr)
+
+    def headless(self, rows, cols, fill):
+        size = f'{rows}x{cols}'
+        matrix = generate(rows, cols, BENCH_FILLS[fill])
+        filename = os.path.join(self.folder, f'{size}-{fill}.html')
+        matrix.write(filename)
+        measure = lambda op, setup, run: self.measure("headless", size, fill, op, setup, run)
+        measure("file_read",        lambda: filename, Matrix.read)
+        measure("file_write",       lambda: matrix,   lambda m: m.write(filename))
+        measure("file_write_svg",   lambda: matrix,   lambda m: m.write_svg(filename.replace(".html", ".svg"), self.metrics))
+        measure("file_write_excel", lambda: matrix,   lambda m: m.write_excel(filename.replace(".html", ".xlsx"), self.metrics))
+        measure("digest",           lambda: matrix,   lambda m: m.digest())
+        text = tsv(matrix)
+        measure("paste",            lambda: Matrix(),  lambda m: m.paste(Matrix.tsv(text)))
+
+    def gui(self, raci, rows, cols, fill):
+        size = f'{rows}x{cols}'
+        matrix = generate(rows, cols, BENCH_FILLS[fill])
+        filename = os.path.join(self.folder, f'{size}-{fill}-gui.html')
+        matrix.write(filename)
+        def loaded():
+            raci.file_read(filename)
+            raci.window.update()
+            return raci
+        def edit_cells(raci):
+            for cell in list(raci.cells.values()):
+                if cell.type == "data":
+                    cell.button_data()
+            raci.window.update()
+        measure = lambda op, setup, run: self.measure("gui", size, fill, op, setup, run)
+        measure("file_read",        lambda: raci, lambda r: (r.file_read(filename), r.window.update()))
+        measure("file_write",       loaded, lambda r: r.file_write(filename))
+        measure("file_write_svg",   loaded, lambda r: r.file_write_svg(filename.replace(".html", ".svg")))
+        measure("file_write_excel", loaded, lambda r: r.file_write_excel(filename.replace(".html", ".xlsx")))
+        measure("row_del",          loaded, lambda r: (r.row_del(1), r.window.update()))
+        measure("col_del",          loaded, lambda r: (r.col_del(1), r.window.update()))
+        measure("row_swap",         loaded, lambda r: (r.row_swap(1, r.rows-1), r.window.update()))
+        measure("view_toggle",      loaded, lambda r: (r.view_toggle(), r.window.update()))
+        measure("cell_edit",        loaded, edit_cells)
+        text = tsv(matrix)
+        def cleared():
+            raci.file_new()
+            raci.window.update()
+            return raci
+        measure("paste",            cleared, lambda r: (r.paste(Matrix.tsv(text)), r.window.update()))
+
+def compare(results, baseline, threshold):
+    # Lists operations slower than threshold times the baseline
+    known = {}
+    for result in baseline.get("results", []):
+        known[(result["mode"], result["size"], result["fill"], result["op"])] = result["seconds"]
+    slower = []
+    for result in results:
+        before = known.get((result["mode"], result["size"], result["fill"], result["op"]))
+        if before and before >= BENCH_FLOOR and result["seconds"] > before * threshold:
+            slower.append(f'{result["mode"]} {result["size"]} {result["fill"]} {result["op"]}: '
+                          f'{before*1000:.2f} ms -> {result["seconds"]*1000:.2f} ms')
+    return slower
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark RACI load, edit and export paths")
+    parser.add_argument("--sizes",     default=BENCH_SIZES, help="Comma separated ROWSxCOLS, e.g. 10x10,5000x1000")
+    parser.add_argument("--fills",     default=",".join(BENCH_FILLS), help="Comma separated: dense, sparse")
+    parser.add_argument("--repeat",    default=BENCH_REPEAT, type=int)
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc peak memory runs")
+    parser.add_argument("--gui",       action="store_true", help="Also measure a Raci window (needs a display)")
+    parser.add_argument("--gui-cells", default=BENCH_CELLS, type=int, help="Largest chart measured with --gui")
+    parser.add_argument("--baseline",  default="", help="Earlier results to compare against")
+    parser.add_argument("--threshold", default=1.25, type=float, help="Slowdown reported as a regression")
+    parser.add_argument("-o", "--output", default="", help="JSON results file, default stdout")
+    args = parser.parse_args(argv)
+    sizes = []
+    for size in args.sizes.split(","):
+        rows, cols = size.lower().split("x")
+        sizes.append((int(rows), int(cols)))
+    fills = [fill for fill in args.fills.split(",") if fill in BENCH_FILLS]
+    raci = None
+    with tempfile.TemporaryDirectory() as folder:
+        bench = Bench(folder, args.repeat, not args.no_memory)
+        for rows, cols in sizes:
+            for fill in fills:
+                bench.headless(rows, cols, fill)
+        if args.gui:
+            from Raci import Raci
+            raci = Raci(mainloop=False)
+            for rows, cols in sizes:
+                if rows * cols <= args.gui_cells:
+                    for fill in fills:
+                        bench.gui(raci, rows, cols, fill)
+            raci.window.destroy()
+    report = {
+        "generator" : GENERATOR,
+        "python"    : platform.python_version(),
+        "platform"  : platform.platform(),
+        "time"      : time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results"   : bench.results
+    }
+    if args.output != "":
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.baseline != "":
+        with open(args.baseline, "r") as f:
+            slower = compare(bench.results, json.load(f), args.threshold)
+        for line in slower:
+            print(f'Regression: {line}', file=sys.stderr)
+        if len(slower):
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
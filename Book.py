@@ -0,0 +1,343 @@
+########################################################################
+#
+# RACI
+#
+# A tool to create RACI responsibility assignment matricies.
+#
+# https://github.com/marjohloo/RACI
+#
+# Copyright 2022 Martin Looker
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################
+
+# Package imports
+import argparse
+import hashlib
+import json
+import os
+import sys
+import zipfile
+
+# Project imports
+from Matrix import *
+
+# A workbook of related charts, for example a program with a sheet per
+# project and per workstream below each project. The .racibook file is a zip
+# holding index.json, which lists the sheets with their titles and parents,
+# and a RACI .html file for each sheet:
+#
+#   python Book.py program.racibook --add program.html
+#   python Book.py program.racibook --add alpha.html beta.html --parent 1
+#   python Book.py program.racibook --excel program.xlsx
+#
+# Opening a workbook only reads the index, each sheet is read when it is
+# first needed and sheets that have not changed are copied as they are when
+# the workbook is saved.
+
+BOOK_INDEX   = "index.json"
+BOOK_VERSION = 1
+BOOK_ROLLUP  = "Rollup"
+
+class Sheet:
+
+    def __init__(self, id, title, parent=None, matrix=None):
+        self.id     = id
+        self.title  = title
+        # Id of the parent sheet or None at the top level
+        self.parent = parent
+        # Held while loaded, or until saved when changed
+        self.matrix = matrix
+        self.dirty  = matrix != None
+
+    def member(self):
+        # File holding the sheet within the workbook
+        return f'sheet{self.id}.html'
+
+class Book:
+
+    def __init__(self, filename=""):
+        self.filename = filename
+        self.sheets   = []
+        # Sheets removed since the last save
+        self.changed  = False
+        # Digest of the saved sheets, their order and titles
+        self.digest   = None
+
+    def open(filename):
+        # Reads the index of a workbook, raises OSError or ValueError if it
+        # is not readable
+        book = Book(filename)
+        try:
+            with zipfile.ZipFile(filename, "r") as z:
+                index = json.loads(z.read(BOOK_INDEX).decode("utf-8"))
+            book.digest = index.get("digest")
+            for entry in index.get("sheets", []):
+                book.sheets.append(Sheet(int(entry["id"]), entry.get("title", "TITLE"), entry.get("parent")))
+        except (zipfile.BadZipFile, KeyError, TypeError, AttributeError) as error:
+            raise ValueError(f'{filename}: not a RACI workbook') from error
+        return book
+
+    def sheet(self, id):
+        for sheet in self.sheets:
+            if sheet.id == id:
+                return sheet
+        return None
+
+    def children(self, sheet):
+        id = None
+        if sheet != None:
+            id = sheet.id
+        return [child for child in self.sheets if child.parent == id]
+
+    def order(self):
+        # (sheet, depth) for every sheet, each followed by its children,
+        # sheets whose parent is missing are shown at the top level
+        ids = set(sheet.id for sheet in self.sheets)
+        result = []
+        stack = [(sheet, 0) for sheet in reversed(self.sheets) if sheet.parent not in ids]
+        while len(stack):
+            sheet, depth = stack.pop()
+            result.append((sheet, depth))
+            for child in reversed(self.children(sheet)):
+                stack.append((child, depth+1))
+        return result
+
+    def dirty(self):
+        if self.changed:
+            return True
+        for sheet in self.sheets:
+            if sheet.dirty:
+                return True
+        return False
+
+    def add(self, matrix, parent=None):
+        # Adds matrix as the last child of parent, returns the new sheet
+        id = 1
+        for sheet in self.sheets:
+            if sheet.id >= id:
+                id = sheet.id + 1
+        parent_id = None
+        if parent != None:
+            parent_id = parent.id
+        sheet = Sheet(id, matrix.value(0, 0), parent_id, matrix)
+        self.sheets.append(sheet)
+        return sheet
+
+    def remove(self, sheet):
+        # Removes sheet and the sheets below it
+        removed = set([sheet.id])
+        for other, depth in self.order():
+            if other.parent in removed:
+                removed.add(other.id)
+        self.sheets = [other for other in self.sheets if other.id not in removed]
+        self.changed = True
+        return removed
+
+    @Perf.timed("Book.load")
+    def load(self, sheet):
+        # The sheet's Matrix, read from the workbook if not already held,
+        # None if it cannot be read
+        if sheet.matrix == None and self.filename != "":
+            try:
+                with zipfile.ZipFile(self.filename, "r") as z:
+                    text = z.read(sheet.member()).decode("utf-8")
+            except (OSError, KeyError, zipfile.BadZipFile):
+                return None
+            sheet.matrix = Matrix.parse(text.splitlines(keepends=True))
+        return sheet.matrix
+
+    def unload(self, sheet):
+        # Frees the sheet's Matrix unless it has unsaved changes
+        if not sheet.dirty:
+            sheet.matrix = None
+
+    def put(self, sheet, matrix):
+        # Replaces the sheet with a changed Matrix
+        sheet.matrix = matrix
+        sheet.title  = matrix.value(0, 0)
+        sheet.dirty  = True
+
+    @Perf.timed("Book.save")
+    def save(self, filename=None, generator=GENERATOR):
+        if filename == None:
+            filename = self.filename
+        source = None
+        if self.filename != "" and os.path.isfile(self.filename):
+            source = zipfile.ZipFile(self.filename, "r")
+        try:
+            with zipfile.ZipFile(filename + ".tmp", "w", zipfile.ZIP_DEFLATED) as z:
+                digests = []
+                for sheet in self.sheets:
+                    if sheet.matrix != None:
+                        data = sheet.matrix.html(generator).encode("utf-8")
+                    else:
+                        # Unchanged and never loaded, copy without parsing
+                        data = source.read(sheet.member())
+                    z.writestr(sheet.member(), data)
+                    digests.append(f'{sheet.id}\x1f{sheet.parent}\x1f{sheet.title}\x1f{hashlib.blake2b(data, digest_size=16).hexdigest()}')
+                digest = hashlib.blake2b("\x1e".join(digests).encode("utf-8"), digest_size=16).hexdigest()
+                index = {"version"   : BOOK_VERSION,
+                         "generator" : generator,
+                         "digest"    : digest,
+                         "sheets"    : [{"id" : sheet.id, "title" : sheet.title, "parent" : sheet.parent} for sheet in self.sheets]}
+                z.writestr(BOOK_INDEX, json.dumps(index, indent=2))
+        finally:
+            if source != None:
+                source.close()
+        os.replace(filename + ".tmp", filename)
+        self.filename = filename
+        self.changed = False
+        self.digest = digest
+        for sheet in self.sheets:
+            sheet.dirty = False
+            sheet.matrix = None
+
+    def export(self, metrics):
+        # Writes the workbook's .xlsx unless it already holds the saved
+        # sheets, returns True if written
+        target = Book.excel_name(self.filename)
+        hashes = Hash.load(self.filename)
+        if self.digest != None and Hash.fresh(hashes, target, self.digest):
+            return False
+        self.write_excel(target, metrics)
+        if self.digest != None:
+            Hash.stamp(hashes, target, self.digest)
+            Hash.save(self.filename, hashes)
+        return True
+
+    def excel_name(filename):
+        # Excel file exported alongside a workbook
+        return os.path.splitext(filename)[0] + ".xlsx"
+
+    def sheet_name(title, names):
+        # Excel worksheet name for title not already in names (which are
+        # compared ignoring case, as Excel does)
+        base = Matrix.sheet_name(title)
+        name = base
+        count = 1
+        while name.lower() in names:
+            count += 1
+            suffix = f' ({count})'
+            name = base[:31-len(suffix)] + suffix
+        names.add(name.lower())
+        return name
+
+    def rollup_text(scheme, counts):
+        # Roles of one person on one sheet as initials, e.g. "R3 A C2"
+        parts = []
+        for index in range(1, len(scheme.roles)):
+            count = counts.get(index, 0)
+            if count == 1:
+                parts.append(scheme.roles[index][:1])
+            elif count > 1:
+                parts.append(f'{scheme.roles[index][:1]}{count}')
+        return " ".join(parts)
+
+    @Perf.timed("Book.excel")
+    def excel(self, target, metrics):
+        # One worksheet per sheet plus a first worksheet rolling up each
+        # person's roles on every sheet. Sheets are loaded one at a time.
+        options = {}
+        if not isinstance(target, str):
+            options["in_memory"] = True
+        with xlsxwriter.Workbook(target, options) as w:
+            rollup = w.add_worksheet(BOOK_ROLLUP)
+            names = set([BOOK_ROLLUP.lower()])
+            people = {}
+            lines = []
+            for sheet, depth in self.order():
+                loaded = sheet.matrix != None
+                matrix = self.load(sheet)
+                if matrix == None:
+                    continue
+                name = Book.sheet_name(sheet.title, names)
+                matrix.worksheet(w, name, metrics)
+                roles = {}
+                for col in range(1, matrix.cols):
+                    person = matrix.value(0, col)
+                    if person not in people:
+                        people[person] = len(people)
+                    counts = roles.setdefault(person, {})
+                    for row in range(1, matrix.rows):
+                        index = matrix.scheme.id(matrix.value(row, col))
+                        if index != 0:
+                            counts[index] = counts.get(index, 0) + 1
+                texts = {person: Book.rollup_text(matrix.scheme, counts) for person, counts in roles.items()}
+                lines.append((sheet.title, depth, name, matrix.rows-1, texts))
+                if not loaded:
+                    self.unload(sheet)
+            # Rollup worksheet
+            format_bold = w.add_format({"bold" : 1})
+            formats_link = {}
+            headers = ["Sheet", "Rows"] + list(people)
+            widths = [metrics.excel(header, True) for header in headers]
+            for col, header in enumerate(headers):
+                rollup.write(0, col, header, format_bold)
+            for row, (title, depth, name, count, texts) in enumerate(lines, 1):
+                if depth not in formats_link:
+                    formats_link[depth] = w.add_format({"indent" : depth, "font_color" : "blue", "underline" : 1})
+                link = name.replace("'", "''")
+                rollup.write_url(row, 0, f"internal:'{link}'!A1", formats_link[depth], title)
+                widths[0] = max(widths[0], metrics.excel(title) + depth * 2)
+                rollup.write(row, 1, count)
+                for person, text in texts.items():
+                    col = 2 + people[person]
+                    rollup.write(row, col, text)
+                    widths[col] = max(widths[col], metrics.excel(text))
+            for col, width in enumerate(widths):
+                rollup.set_column(col, col, math.ceil(max(width, WIDTH_EXCEL_MIN)))
+            rollup.freeze_panes(1, 2)
+
+    def write_excel(self, filename, metrics):
+        self.excel(filename, metrics)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and export RACI workbooks")
+    parser.add_argument("book")
+    parser.add_argument("--add",    nargs="+", default=[], metavar="HTML", help="Charts to add as sheets")
+    parser.add_argument("--parent", type=int, help="Id of the sheet the added sheets go below")
+    parser.add_argument("--excel",  metavar="XLSX", help="Export a worksheet per sheet plus a rollup")
+    parser.add_argument("--list",   action="store_true", help="List the sheets")
+    args = parser.parse_args(argv)
+    if os.path.isfile(args.book):
+        book = Book.open(args.book)
+    else:
+        book = Book(args.book)
+    if len(args.add):
+        parent = None
+        if args.parent != None:
+            parent = book.sheet(args.parent)
+            if parent == None:
+                print(f'{args.book}: no sheet {args.parent}')
+                return 1
+        for filename in args.add:
+            matrix = Matrix.read(filename)
+            if matrix == None:
+                print(f'{filename}: RACI data not found')
+                return 1
+            book.add(matrix, parent)
+        book.save(args.book)
+    if args.list:
+        for sheet, depth in book.order():
+            print(f'{sheet.id:4} {"  " * depth}{sheet.title}')
+    if args.excel:
+        metrics = Metrics()
+        book.write_excel(args.excel, metrics)
+        metrics.save()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
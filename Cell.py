@@ -29,6 +29,8 @@ import ttkbootstrap as ttk
 from   ttkbootstrap.constants import *
 
 # Project imports
+from Hash import *
+from Perf import *
 from Raci import *
 
 # Useful characters ← ↑ → ↓ × ▲ ► ▼ ◄ ˂ ˃ ˄ ˅
@@ -41,13 +43,16 @@ WIDTH_BUT   = 1
 
 class Cell:
 
-    def __init__(self, raci, parent, row, col, type, value):
+    @Perf.timed("Cell")
+    def __init__(self, raci, parent, row, col, type, value, show=True):
         self.raci       = raci
         self.row       = row
         self.col       = col
         self.type      = type
         self.var       = ttk.StringVar(value=value)
         self.var.trace_add("write", lambda *_: self.var_write())
+        self.hash      = 0
+        self.hash_update()
         self.frame     = ttk.Frame(parent)
         if STYLE_FRAME:
             if row & 0x1:
@@ -60,46 +65,54 @@ class Cell:
                     self.frame.configure(bootstyle="dark")
                 else:
                     self.frame.configure(bootstyle="light")
-        self.frame.grid(column=self.col, row=self.row, sticky=(W, S, E))
+        # Callers creating many cells at once may grid them afterwards
+        if show:
+            self.frame.grid(column=self.col, row=self.row, sticky=(W, S, E))
         self.button      = None
         self.entry       = None
         self.button_ul   = None
         self.button_dr   = None
+        self.frame_ctl   = None
+        self.mark_style  = None
         if self.type == "data":
             self.button = ttk.Button(self.frame, textvariable=self.var, command=self.button_data)
             self.button.grid(column=0, row=0, sticky=(N, W, S, E), padx=PAD, pady=PAD)
             self.frame.columnconfigure(0, weight=1)
-            index = 0
-            if value in self.raci.roles:
-                index = self.raci.roles.index(value)
-            self.data_style(index)
+            self.data_style(self.raci.scheme.id(value))
             self.raci.saved = False
             #self.raci.window.update()
             #print(self.frame.grid_bbox())
         elif self.type == "row":
-            self.button_ul   = ttk.Button(self.frame, text="˄", width=WIDTH_BUT, command=self.button_row_up,    bootstyle="primary")
-            self.button      = ttk.Button(self.frame, text="×", width=WIDTH_BUT, command=self.button_row_del,   bootstyle="danger")
-            self.button_dr   = ttk.Button(self.frame, text="˅", width=WIDTH_BUT, command=self.button_row_down,  bootstyle="primary")
-            self.entry       = ttk.Entry (self.frame,           width=WIDTH_ROW, textvariable=self.var,         bootstyle="primary")
+            # Controls share a frame so they are shown and hidden together
+            self.frame_ctl   = ttk.Frame (self.frame)
+            self.button_ul   = ttk.Button(self.frame_ctl, text="˄", width=WIDTH_BUT, command=self.button_row_up,   style=self.raci.style_name(ttk.Button, "primary"))
+            self.button      = ttk.Button(self.frame_ctl, text="×", width=WIDTH_BUT, command=self.button_row_del,  style=self.raci.style_name(ttk.Button, "danger"))
+            self.button_dr   = ttk.Button(self.frame_ctl, text="˅", width=WIDTH_BUT, command=self.button_row_down, style=self.raci.style_name(ttk.Button, "primary"))
+            self.entry       = ttk.Entry (self.frame,               width=WIDTH_ROW, textvariable=self.var,        style=self.raci.style_name(ttk.Entry,  "primary"))
             self.button_ul.grid  (column=0, row=0, sticky=(N, W, S, E), padx=(PAD,0), pady=PAD)
             self.button.grid     (column=1, row=0, sticky=(N, W, S, E), padx=(PAD,0), pady=PAD)
             self.button_dr.grid  (column=2, row=0, sticky=(N, W, S, E), padx=(PAD,0), pady=PAD)
-            self.entry.grid      (column=3, row=0, sticky=(N, W, S, E), padx=PAD,     pady=PAD)
-            self.frame.columnconfigure(3, weight=1)
+            self.frame_ctl.grid  (column=0, row=0, sticky=(N, W, S, E))
+            self.entry.grid      (column=1, row=0, sticky=(N, W, S, E), padx=PAD,     pady=PAD)
+            self.frame.columnconfigure(1, weight=1)
             self.view()
             self.raci.saved = False
         elif self.type == "col":
-            self.button_ul   = ttk.Button   (self.frame, text="˂", width=WIDTH_BUT, command=self.button_col_left,  bootstyle="info")
-            self.button      = ttk.Button   (self.frame, text="×", width=WIDTH_BUT, command=self.button_col_del,   bootstyle="danger")
-            self.button_dr   = ttk.Button   (self.frame, text="˃", width=WIDTH_BUT, command=self.button_col_right, bootstyle="info")
-            self.entry       = ttk.Entry    (self.frame,           width=WIDTH_COL, textvariable=self.var,         bootstyle="info")
+            # Controls share a frame so they are shown and hidden together
+            self.frame_ctl   = ttk.Frame    (self.frame)
+            self.button_ul   = ttk.Button   (self.frame_ctl, text="˂", width=WIDTH_BUT, command=self.button_col_left,  style=self.raci.style_name(ttk.Button, "info"))
+            self.button      = ttk.Button   (self.frame_ctl, text="×", width=WIDTH_BUT, command=self.button_col_del,   style=self.raci.style_name(ttk.Button, "danger"))
+            self.button_dr   = ttk.Button   (self.frame_ctl, text="˃", width=WIDTH_BUT, command=self.button_col_right, style=self.raci.style_name(ttk.Button, "info"))
+            self.entry       = ttk.Entry    (self.frame,               width=WIDTH_COL, textvariable=self.var,         style=self.raci.style_name(ttk.Entry,  "info"))
             self.button_ul.grid  (column=0, row=0, sticky=(N, W, S, E), padx=(PAD,0), pady=(PAD,0))
             self.button.grid     (column=1, row=0, sticky=(N, W, S, E), padx=PAD,     pady=(PAD,0))
             self.button_dr.grid  (column=2, row=0, sticky=(N, W, S, E), padx=(0,PAD), pady=(PAD,0))
-            self.entry.grid      (column=0, row=1, sticky=(N, W, S, E), padx=PAD, pady=PAD, columnspan=3)
+            self.frame_ctl.columnconfigure(0, weight=1)
+            self.frame_ctl.columnconfigure(1, weight=1)
+            self.frame_ctl.columnconfigure(2, weight=1)
+            self.frame_ctl.grid  (column=0, row=0, sticky=(N, W, S, E))
+            self.entry.grid      (column=0, row=1, sticky=(N, W, S, E), padx=PAD, pady=PAD)
             self.frame.columnconfigure(0, weight=1)
-            self.frame.columnconfigure(1, weight=1)
-            self.frame.columnconfigure(2, weight=1)
             self.view()
             self.raci.saved = False
         elif self.type == "origin":
@@ -133,22 +146,20 @@ class Cell:
 
     def var_write(self):
         # print(f'var_write       ({self.row}, {self.col})')
+        self.hash_update()
         self.raci.saved = False
 
+    def hash_update(self):
+        # Swap this cell's old hash for its new one in the chart's hash
+        cell_hash = Hash.cell(self.row, self.col, self.var.get())
+        self.raci.hash ^= self.hash ^ cell_hash
+        self.hash = cell_hash
+
     def button_data(self):
-        print(f'Cell.button_data()')
         value = self.var.get()
-        print(f'    value={value}')
-        index = 0
-        print(f'    index={index}')
-        if value in self.raci.roles:
-            index = self.raci.roles.index(value)
-            print(f'    index={index}')
-            index += 1
-            if index >= len(self.raci.roles):
-                index = 0
-        value = self.raci.roles[index]
-        print(f'    value={value}, index={index}')
+        index = self.raci.scheme.next(value)
+        log.debug('Cell.button_data() (%d, %d) "%s" -> "%s"', self.row, self.col, value, self.raci.scheme.roles[index])
+        value = self.raci.scheme.roles[index]
         self.var.set(value)
         self.data_style(index)
 
@@ -181,9 +192,24 @@ class Cell:
             self.raci.col_swap(self.col, self.col+1)
 
     def data_style(self, index):
-        if index >= len(self.raci.styles):
+        if index >= len(self.raci.role_styles):
             index = 0
-        self.button.configure(bootstyle=self.raci.styles[index])
+        if self.mark_style != None:
+            self.button.configure(style=self.raci.role_styles_outline[index])
+        else:
+            self.button.configure(style=self.raci.role_styles[index])
+
+    def mark(self, style):
+        # Highlight a compared cell, None restores the normal style
+        self.mark_style = style
+        if self.type == "data":
+            self.data_style(self.raci.scheme.id(self.var.get()))
+        elif self.type == "row":
+            self.entry.configure(style=self.raci.style_name(ttk.Entry, style if style != None else "primary"))
+        elif self.type == "col":
+            self.entry.configure(style=self.raci.style_name(ttk.Entry, style if style != None else "info"))
+        elif self.type == "origin":
+            self.entry.configure(style=self.raci.style_name(ttk.Entry, style if style != None else "dark"))
 
     def grid(self):
         self.frame.grid(column=self.col, row=self.row, sticky=(W, S, E))
@@ -208,36 +234,26 @@ class Cell:
 
 
     def view(self):
-        if self.type == "row":
-            if self.raci.view == "max":
-                self.button_ul.grid()
-                self.button_dr.grid()
-                self.button.grid()
-            else:
-                self.button.grid_remove()
-                self.button_dr.grid_remove()
-                self.button_ul.grid_remove()
-        elif self.type == "col":
+        if self.type == "row" or self.type == "col":
             if self.raci.view == "max":
-                self.button_ul.grid()
-                self.button.grid()
-                self.button_dr.grid()
+                self.frame_ctl.grid()
             else:
-                self.button_dr.grid_remove()
-                self.button.grid_remove()
-                self.button_ul.grid_remove()
+                self.frame_ctl.grid_remove()
         elif self.type == "origin":
             if self.raci.view == "max":
-                self.button.configure(bootstyle="success")
+                self.button.configure(style=self.raci.style_name(ttk.Button, "success"))
             else:
-                self.button.configure(bootstyle="success-outline")
+                self.button.configure(style=self.raci.style_name(ttk.Button, "success-outline"))
 
     def move(self, row, col):
         self.row = row
         self.col = col
+        self.hash_update()
         self.grid()
 
     def destroy(self):
+        self.raci.hash ^= self.hash
+        self.hash = 0
         if self.button != None:
             self.button.destroy()
         if self.entry != None:
@@ -246,6 +262,8 @@ class Cell:
             self.button_ul.destroy()
         if self.button_dr != None:
             self.button_dr.destroy()
+        if self.frame_ctl != None:
+            self.frame_ctl.destroy()
         self.frame.destroy()
 
     def key(row, col):
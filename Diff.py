@@ -0,0 +1,272 @@
+########################################################################
+#
+# RACI
+#
+# A tool to create RACI responsibility assignment matricies.
+#
+# https://github.com/marjohloo/RACI
+#
+# Copyright 2022 Martin Looker
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################
+
+# Package imports
+import argparse
+import bisect
+import sys
+
+# Project imports
+from Matrix import *
+
+# Rows and columns are matched by title rather than position, as they are
+# freely reordered. Repeated titles are told apart by their occurrence, so
+# each row or column is keyed by (title, occurrence).
+
+def keys(titles):
+    seen = {}
+    result = []
+    for title in titles:
+        count = seen.get(title, 0)
+        seen[title] = count + 1
+        result.append((title, count))
+    return result
+
+def key_text(key):
+    title, count = key
+    if count:
+        return f'{title} #{count+1}'
+    return title
+
+def moved(keys_a, index_b):
+    # Keys common to both sides that changed relative order, found as those
+    # outside the longest run of keys already in increasing order in b
+    common = [key for key in keys_a if key in index_b]
+    tails = []
+    tails_at = []
+    parent = [-1] * len(common)
+    for index, key in enumerate(common):
+        position = index_b[key]
+        at = bisect.bisect_left(tails, position)
+        if at == len(tails):
+            tails.append(position)
+            tails_at.append(index)
+        else:
+            tails[at] = position
+            tails_at[at] = index
+        if at > 0:
+            parent[index] = tails_at[at-1]
+    keep = set()
+    index = tails_at[-1] if len(tails_at) else -1
+    while index >= 0:
+        keep.add(common[index])
+        index = parent[index]
+    return [key for key in common if key not in keep]
+
+class Side:
+
+    # Title keyed access to one matrix
+    def __init__(self, matrix):
+        self.matrix   = matrix
+        self.row_keys = keys([matrix.value(row, 0) for row in range(1, matrix.rows)])
+        self.col_keys = keys([matrix.value(0, col) for col in range(1, matrix.cols)])
+        self.row_index = {key: row+1 for row, key in enumerate(self.row_keys)}
+        self.col_index = {key: col+1 for col, key in enumerate(self.col_keys)}
+
+    def get(self, row_key, col_key):
+        # Value of a cell or None if the row or column is missing
+        row = self.row_index.get(row_key)
+        col = self.col_index.get(col_key)
+        if row == None or col == None:
+            return None
+        return self.matrix.value(row, col)
+
+class Diff:
+
+    # Changes needed to turn matrix a into matrix b
+    def __init__(self, a, b):
+        self.a = Side(a)
+        self.b = Side(b)
+        self.title        = None
+        if a.value(0, 0) != b.value(0, 0):
+            self.title = (a.value(0, 0), b.value(0, 0))
+        self.rows_added   = [key for key in self.b.row_keys if key not in self.a.row_index]
+        self.rows_removed = [key for key in self.a.row_keys if key not in self.b.row_index]
+        self.rows_moved   = moved(self.a.row_keys, self.b.row_index)
+        self.cols_added   = [key for key in self.b.col_keys if key not in self.a.col_index]
+        self.cols_removed = [key for key in self.a.col_keys if key not in self.b.col_index]
+        self.cols_moved   = moved(self.a.col_keys, self.b.col_index)
+        # Changed cells as (row_key, col_key, value_a, value_b), rows whose
+        # common cells are equal are skipped without comparing cells
+        self.cells        = []
+        cols = [key for key in self.a.col_keys if key in self.b.col_index]
+        cols_a = [self.a.col_index[key] for key in cols]
+        cols_b = [self.b.col_index[key] for key in cols]
+        for row_key in self.a.row_keys:
+            if row_key in self.b.row_index:
+                row = self.a.row_index[row_key]
+                row_a = tuple(a.value(row, col) for col in cols_a)
+                row = self.b.row_index[row_key]
+                row_b = tuple(b.value(row, col) for col in cols_b)
+                if row_a != row_b:
+                    for index, col_key in enumerate(cols):
+                        if row_a[index] != row_b[index]:
+                            self.cells.append((row_key, col_key, row_a[index], row_b[index]))
+
+    def empty(self):
+        return (self.title == None and
+                len(self.rows_added) == 0 and len(self.rows_removed) == 0 and len(self.rows_moved) == 0 and
+                len(self.cols_added) == 0 and len(self.cols_removed) == 0 and len(self.cols_moved) == 0 and
+                len(self.cells) == 0)
+
+    def report(self):
+        lines = []
+        if self.title != None:
+            lines.append(f'Title: "{self.title[0]}" -> "{self.title[1]}"')
+        for label, found in (("Row added",      self.rows_added),
+                             ("Row removed",    self.rows_removed),
+                             ("Row moved",      self.rows_moved),
+                             ("Column added",   self.cols_added),
+                             ("Column removed", self.cols_removed),
+                             ("Column moved",   self.cols_moved)):
+            for key in found:
+                lines.append(f'{label}: {key_text(key)}')
+        for row_key, col_key, value_a, value_b in self.cells:
+            lines.append(f'Cell changed: {key_text(row_key)} / {key_text(col_key)}: "{value_a}" -> "{value_b}"')
+        return lines
+
+class Merge:
+
+    # Three-way merge of ours and theirs, both edited from base. Ours decides
+    # the order of rows and columns, rows and columns added in theirs are
+    # appended. Conflicting cells keep our value and are listed in conflicts.
+    # A row or column removed by one side but changed by the other is kept
+    # whole from the side that changed it, as a single conflict.
+    def __init__(self, base, ours, theirs):
+        self.base   = Side(base)
+        self.ours   = Side(ours)
+        self.theirs = Side(theirs)
+        self.conflicts = []
+        # Side each kept row and column is taken from, by key
+        self.kept_rows = {}
+        self.kept_cols = {}
+        row_keys = self.merge_keys(self.base.row_keys, self.ours.row_keys, self.theirs.row_keys, True)
+        col_keys = self.merge_keys(self.base.col_keys, self.ours.col_keys, self.theirs.col_keys, False)
+        title = self.merge_value(base.value(0, 0), ours.value(0, 0), theirs.value(0, 0), "Title")
+        data = [[title] + [col_key[0] for col_key in col_keys]]
+        for row_key in row_keys:
+            values = [row_key[0]]
+            for col_key in col_keys:
+                value = None
+                side = self.kept_rows.get(row_key, self.kept_cols.get(col_key))
+                if side != None:
+                    value = side.get(row_key, col_key)
+                if value == None:
+                    value = self.merge_value(self.base.get(row_key, col_key),
+                                             self.ours.get(row_key, col_key),
+                                             self.theirs.get(row_key, col_key),
+                                             f'{key_text(row_key)} / {key_text(col_key)}')
+                values.append(value)
+            data.append(values)
+        self.matrix = Matrix(title, data, ours.scheme)
+        self.matrix.colors = ours.colors
+
+    def merge_value(self, base, ours, theirs, where):
+        if ours == theirs:
+            value = ours
+        elif ours == base:
+            value = theirs
+        elif theirs == base:
+            value = ours
+        else:
+            texts = [f'"{value}"' if value != None else "removed" for value in (ours, theirs)]
+            self.conflicts.append(f'Conflict: {where}: ours {texts[0]}, theirs {texts[1]}')
+            value = ours
+        if value == None:
+            value = ""
+        return value
+
+    def merge_keys(self, base, ours, theirs, is_row):
+        base_set   = set(base)
+        ours_set   = set(ours)
+        theirs_set = set(theirs)
+        kept = self.kept_cols
+        if is_row:
+            kept = self.kept_rows
+        result = []
+        for key in ours:
+            if key in base_set and key not in theirs_set:
+                # Removed by them, keep only if we changed it
+                if self.changed(key, is_row, self.ours):
+                    self.conflicts.append(f'Conflict: {key_text(key)} removed by theirs but changed by ours')
+                    kept[key] = self.ours
+                    result.append(key)
+            else:
+                result.append(key)
+        for key in theirs:
+            if key not in ours_set:
+                if key not in base_set:
+                    result.append(key)
+                elif self.changed(key, is_row, self.theirs):
+                    # Removed by us, keep only if they changed it
+                    self.conflicts.append(f'Conflict: {key_text(key)} removed by ours but changed by theirs')
+                    kept[key] = self.theirs
+                    result.append(key)
+        return result
+
+    def changed(self, key, is_row, side):
+        if is_row:
+            others = self.base.col_keys
+        else:
+            others = self.base.row_keys
+        for other in others:
+            if is_row:
+                base_value = self.base.get(key, other)
+                side_value = side.get(key, other)
+            else:
+                base_value = self.base.get(other, key)
+                side_value = side.get(other, key)
+            if side_value != None and side_value != base_value:
+                return True
+        return False
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare or merge RACI files")
+    parser.add_argument("files", nargs="+", help="A B to compare, or BASE OURS THEIRS to merge")
+    parser.add_argument("-o", "--output", default="", help="Merged .html file to write")
+    args = parser.parse_args(argv)
+    matrices = []
+    for filename in args.files:
+        matrix = Matrix.read(filename)
+        if matrix == None:
+            print(f'{filename}: RACI data not found', file=sys.stderr)
+            return 2
+        matrices.append(matrix)
+    if len(matrices) == 2:
+        diff = Diff(matrices[0], matrices[1])
+        for line in diff.report():
+            print(line)
+        return 0 if diff.empty() else 1
+    elif len(matrices) == 3:
+        merge = Merge(matrices[0], matrices[1], matrices[2])
+        for line in merge.conflicts:
+            print(line)
+        if args.output != "":
+            merge.matrix.write(args.output)
+        return 1 if len(merge.conflicts) else 0
+    parser.error("expected 2 files to compare or 3 to merge")
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+########################################################################
+#
+# RACI
+#
+# A tool to create RACI responsibility assignment matricies.
+#
+# https://github.com/marjohloo/RACI
+#
+# Copyright 2022 Martin Looker
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################
+
+# Package imports
+import hashlib
+import json
+import os
+
+# The content hash of a chart is the XOR of a hash of each cell's position
+# and value. A single cell can then be added, removed or changed by XORing
+# out its old hash and XORing in its new one, without visiting the others.
+#
+# Hashes of written files are kept in a .hash file alongside them, along
+# with each file's size and modification time so files changed by other
+# programs are still rewritten.
+
+class Hash:
+
+    def cell(row, col, value):
+        data = f'{row}\x1f{col}\x1f{value}'.encode("utf-8")
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+    def digest(content, signature):
+        # Combines a content hash with anything else affecting the output
+        data = f'{content:016x}\x1f{signature}'.encode("utf-8")
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def sidecar(filename):
+        return os.path.splitext(filename)[0] + ".hash"
+
+    def load(filename):
+        hashes = {}
+        try:
+            with open(Hash.sidecar(filename), "r") as f:
+                hashes = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if not isinstance(hashes, dict):
+            hashes = {}
+        return hashes
+
+    def save(filename, hashes):
+        try:
+            with open(Hash.sidecar(filename), "w") as f:
+                json.dump(hashes, f, indent=2)
+        except OSError:
+            pass
+
+    def fresh(hashes, target, digest):
+        # True if target was written from content with this digest and has
+        # not been touched since
+        entry = hashes.get(os.path.splitext(target)[1].lstrip("."))
+        if not isinstance(entry, dict) or entry.get("digest") != digest:
+            return False
+        try:
+            stat = os.stat(target)
+        except OSError:
+            return False
+        return entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime_ns
+
+    def stamp(hashes, target, digest):
+        # Records that target has just been written from this digest
+        try:
+            stat = os.stat(target)
+        except OSError:
+            return
+        hashes[os.path.splitext(target)[1].lstrip(".")] = {"digest" : digest,
+                                                           "size"   : stat.st_size,
+                                                           "mtime"  : stat.st_mtime_ns}
@@ -0,0 +1,426 @@
+########################################################################
+#
+# RACI
+#
+# A tool to create RACI responsibility assignment matricies.
+#
+# https://github.com/marjohloo/RACI
+#
+# Copyright 2022 Martin Looker
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################
+
+# Package imports
+import csv
+import html
+import io
+import math
+
+# https://xlsxwriter.readthedocs.io/getting_started.html
+# pip install XlsxWriter
+import xlsxwriter
+
+# Project imports
+from Hash    import *
+from Metrics import *
+from Perf    import *
+from Scheme  import *
+
+GENERATOR = "RACI v0.0.1"
+
+WIDTH_SVG_MIN   = 40
+WIDTH_EXCEL_MIN = 8
+
+# A RACI chart held as plain data so it can be loaded, compared and
+# exported without a window. Row 0 holds the column titles, column 0 the
+# row titles and cell (0, 0) the chart title.
+class Matrix:
+
+    def __init__(self, title="TITLE", data=None, scheme=None):
+        if scheme == None:
+            scheme = Scheme.get()
+        self.scheme = scheme
+        self.colors = COLORS
+        if data == None or len(data) == 0:
+            data = [[title]]
+        cols = 0
+        for values in data:
+            if len(values) > cols:
+                cols = len(values)
+        self.data = []
+        for values in data:
+            self.data.append(list(values) + [""] * (cols - len(values)))
+        self.data[0][0] = title
+        self.rows = len(self.data)
+        self.cols = cols
+
+    def value(self, row, col):
+        return self.data[row][col]
+
+    @Perf.timed("Matrix.read")
+    def read(filename):
+        # Returns the Matrix held in a RACI .html file or None
+        with open(filename, "r") as f:
+            return Matrix.parse(f)
+
+    def parse(lines):
+        in_table = False
+        out_table = False
+        title = "TITLE"
+        scheme = None
+        data = []
+        for line in lines:
+            if in_table == False:
+                search = '<meta name="scheme" content="'
+                if search in line:
+                    index = line.find(search)
+                    start = index+len(search)
+                    end   = line.find('"', start)
+                    scheme = Scheme.parse(line[start:end])
+                search = "<title>"
+                if search in line:
+                    index = line.find(search)
+                    if index >= 0:
+                        line = line[index+len(search):]
+                        search = "</title>"
+                        if search in line:
+                            index = line.find(search)
+                            if index >= 0:
+                                line = line[:index]
+                                line = line.strip()
+                                title = html.unescape(line)
+                search = '<table id="RACI"'
+                if search in line:
+                    in_table = True
+            elif out_table == False:
+                if '<tr' in line:
+                    data.append([])
+                elif '<th' in line:
+                    # A cell outside a row is not a chart
+                    if len(data) == 0:
+                        return None
+                    index = line.find('<th')
+                    start = line.find('>', index+len('<th'))+1
+                    end   = line.find('</th>')
+                    data[-1].append(html.unescape(line[start:end].strip()))
+                elif '<td' in line:
+                    if len(data) == 0:
+                        return None
+                    index = line.find('<td')
+                    start = line.find('>', index+len('<td'))+1
+                    end   = line.find('</td>')
+                    data[-1].append(html.unescape(line[start:end].strip()))
+                elif '</table' in line:
+                    out_table = True
+        if len(data) == 0 or len(data[0]) == 0 or out_table == False:
+            return None
+        return Matrix(title, data, scheme)
+
+    def tsv(text):
+        # Rows of values from tab separated text as copied from Excel or
+        # LibreOffice, which quote values holding tabs or new lines
+        block = []
+        for values in csv.reader(io.StringIO(text), delimiter="\t"):
+            block.append([value.replace("\r", " ").replace("\n", " ").strip() for value in values])
+        while len(block) and not any(block[-1]):
+            block.pop()
+        return block
+
+    def paste_values(scheme, block, row, col, rows, cols):
+        # Values a block pastes with its top left at (row, col) into a chart
+        # of rows x cols, as ({(row, col): value}, rows, cols) with the size
+        # grown to fit. Data values are matched to the scheme's roles and a
+        # blank title is ignored.
+        values = {}
+        rows = max(rows, row + len(block))
+        for block_row, block_values in enumerate(block, row):
+            cols = max(cols, col + len(block_values))
+            for block_col, value in enumerate(block_values, col):
+                if block_row > 0 and block_col > 0:
+                    value = scheme.match(value)
+                elif block_row == 0 and block_col == 0 and value == "":
+                    continue
+                values[(block_row, block_col)] = value
+        return values, rows, cols
+
+    def default(row, col):
+        # Value of a newly added cell
+        if row == 0:
+            return f'COL {col}'
+        if col == 0:
+            return f'ROW {row}'
+        return ""
+
+    def paste(self, block, row=0, col=0):
+        # Writes a block of values with its top left at (row, col), growing
+        # the chart once to fit
+        values, rows, cols = Matrix.paste_values(self.scheme, block, row, col, self.rows, self.cols)
+        for row_old, data in enumerate(self.data):
+            data.extend([Matrix.default(row_old, col_new) for col_new in range(self.cols, cols)])
+        for row_new in range(self.rows, rows):
+            self.data.append([Matrix.default(row_new, col_new) for col_new in range(cols)])
+        self.rows = rows
+        self.cols = cols
+        for (cell_row, cell_col), value in values.items():
+            self.data[cell_row][cell_col] = value
+
+    def style(self, value):
+        return self.scheme.style(value)
+
+    def cell_html(self, row, col, row_width):
+        cell_value = self.value(row, col)
+        cell_html = '<'
+        if row == 0:
+            cell_html += 'th'
+        else:
+            cell_html += 'td'
+        if row == 0 and col == 0:
+            cell_html += ' class="left"'
+        elif row == 0:
+            pass
+        elif col == 0:
+            cell_html += ' class="left"'
+        else:
+            cell_html += f' class="{self.style(cell_value)}"'
+        if col > 0 and row == row_width:
+            cell_html += f' width="{int(100/(self.cols+1))}%"'
+        cell_html += f'>{html.escape(cell_value)}<'
+        if row == 0:
+            cell_html += '/th'
+        else:
+            cell_html += '/td'
+        cell_html += '>'
+        return cell_html
+
+    @Perf.timed("Matrix.html")
+    def html(self, generator=GENERATOR):
+        title = html.escape(self.value(0, 0))
+        lines = []
+        # Output header
+        lines.append( '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.1//EN"\n')
+        lines.append( '  "http://www.w3.org/TR/xhtml11/DTD/xhtml11.dtd">\n')
+        lines.append( '<html xmlns="http://www.w3.org/1999/xhtml">\n')
+        lines.append( '  <head>\n')
+        lines.append(f'    <title>{title}</title>\n')
+        lines.append(f'    <meta name="description" content="{title}" />\n')
+        lines.append(f'    <meta name="generator"   content="{generator}" />\n')
+        lines.append(f'    <meta name="scheme"      content="{self.scheme.text()}" />\n')
+        lines.append(f'    <link rel="help"         href="https://github.com/marjohloo/RACI" />\n')
+        lines.append(f'    <link rel="author"       href="https://github.com/marjohloo" />\n')
+        lines.append(f'    <link rel="license"      href="https://www.gnu.org/licenses/gpl-3.0.html" />\n')
+        lines.append( '    <style>\n')
+        lines.append( '        body              { font-size: 10pt; font-family: Calibri,Arial,Helvetica,sans-serif; }\n')
+        lines.append( '        div               { page-break-inside: avoid; }\n')
+        lines.append( '        p                 { font-size: 10pt; }\n')
+        lines.append( '        h1                { font-size: 16pt; font-weight: bold; }\n')
+        lines.append( '        h2                { font-size: 12pt; font-weight: bold; /* page-break-before: always; */ }\n')
+        lines.append( '        table, tr, th, td { font-size: 10pt; text-align: center; vertical-align: top; border: 1px solid black; border-collapse: collapse; padding: 2pt}\n')
+        lines.append( '        .page             { page-break-before: always; }\n')
+        lines.append( '        .left             { text-align: left; }\n')
+        lines.append(f'        .primary          {{ background: {self.colors.get("primary")}; }}\n')
+        lines.append(f'        .secondary        {{ background: {self.colors.get("secondary")}; }}\n')
+        lines.append(f'        .success          {{ background: {self.colors.get("success")}; }}\n')
+        lines.append(f'        .warning          {{ background: {self.colors.get("warning")}; }}\n')
+        lines.append(f'        .primary          {{ background: {self.colors.get("primary")}; }}\n')
+        lines.append(f'        .danger           {{ background: {self.colors.get("danger")}; }}\n')
+        lines.append(f'        .info             {{ background: {self.colors.get("info")}; }}\n')
+        lines.append( '    </style>\n')
+        lines.append( '  </head>\n')
+        # Begin body
+        lines.append( '  <body>\n')
+        lines.append( '    <div>\n')
+        lines.append(f'      <h1>{title}</h1>\n')
+        # Output table data
+        lines.append('      <table id="RACI" width="100%">\n')
+        for row in range(self.rows):
+            lines.append('        <tr>\n')
+            for col in range(self.cols):
+                if row == 0 and col == 0:
+                    lines.append('          <th></th>\n')
+                else:
+                    lines.append(f'          {self.cell_html(row, col, 0)}\n')
+            lines.append('        </tr>\n')
+        lines.append('      </table>\n')
+        lines.append('    </div>\n')
+        # End file
+        lines.append('  </body>\n')
+        lines.append('</html>\n')
+        return "".join(lines)
+
+    @Perf.timed("Matrix.svg")
+    def svg(self, metrics):
+        # Get widths from biggest text in each column
+        font_size = 14
+        widths = []
+        for col in range(self.cols):
+            width = WIDTH_SVG_MIN
+            for row in range(self.rows):
+                font = "Arial"
+                if row == 0 and col == 0:
+                    font = "Arial-Bold"
+                text_w = metrics.width(self.value(row, col), font_size, font)
+                if text_w > width:
+                    width = text_w
+            widths.append(math.ceil(width) + 8)
+        h = font_size
+        h += 7
+        y = 1
+        image_w = sum(widths) + 2
+        image_h = (h*(self.rows)) + 2
+        # Fill color by role id
+        ids   = self.scheme.ids
+        fills = [self.colors.get(style) for style in self.scheme.styles]
+        lines = []
+        # Output header
+        lines.append(f'<svg version="1.1" width="{image_w}" height="{image_h}" xmlns="http://www.w3.org/2000/svg">\n')
+        for row in range(self.rows):
+            x = 1
+            for col in range(self.cols):
+                cell_value = self.value(row, col)
+                w = widths[col]
+                fill = self.colors.get("light")
+                if row > 0 and col > 0:
+                    fill = fills[ids.get(cell_value, 0)]
+                text_y = y+h-6
+                text_x = x+(w/2)
+                text_a = "middle"
+                text_weight = "normal"
+                if col == 0:
+                    text_x = x+3
+                    text_a = "start"
+                if col==0 and row==0:
+                    text_weight = "bold"
+                lines.append(f'  <rect x="{x}" y="{y}" width="{w}" height="{h}" fill="{fill}" stroke="#ffffff" stroke-width="2" />\n')
+                lines.append(f'  <text x="{text_x}" y="{text_y}" font-size="{font_size}" font-family="Arial, Helvetica, sans-serif" text-anchor="{text_a}" font-weight="{text_weight}" fill="#000000">{html.escape(cell_value)}</text>\n')
+                x += w
+            y += h
+        lines.append('</svg>\n')
+        return "".join(lines)
+
+    @Perf.timed("Matrix.excel")
+    def excel(self, target, metrics):
+        # Target is a filename or a writable binary file object
+        options = {}
+        if not isinstance(target, str):
+            options["in_memory"] = True
+        with xlsxwriter.Workbook(target, options) as w:
+            self.worksheet(w, Matrix.sheet_name(self.value(0,0)), metrics)
+
+    def worksheet(self, w, name, metrics):
+        # Adds the chart to an open xlsxwriter workbook as worksheet name
+        # Get widths from biggest text in each column
+        widths = []
+        for col in range(self.cols):
+            width = WIDTH_EXCEL_MIN
+            for row in range(self.rows):
+                text_w = metrics.excel(self.value(row, col), row == 0 or col == 0)
+                if text_w > width:
+                    width = text_w
+            widths.append(math.ceil(width))
+        # Set formats
+        format_bold      = w.add_format({"bold" : 1})
+        # Format by role id
+        format_data      = []
+        for style in self.scheme.styles:
+            format_data.append(w.add_format({"bg_color" : self.colors.get(style)}))
+        # Create worksheet
+        worksheet = w.add_worksheet(name)
+        # Loop through cells
+        for row in range(self.rows):
+            for col in range(self.cols):
+                # Set cell data
+                if row > 0 and col > 0:
+                    worksheet.write(row, col, self.value(row, col))
+                else:
+                    worksheet.write(row, col, self.value(row, col), format_bold)
+        # Set column widths
+        for col in range(self.cols):
+            worksheet.set_column(col, col, widths[col])
+        for index in range(len(self.scheme.roles)):
+            if index < len(format_data):
+                role_quotes = f'"{self.scheme.roles[index]}"'
+                worksheet.conditional_format(1, 1, self.rows-1, self.cols-1, {"type"     : "cell",
+                                                                              "criteria" : "==",
+                                                                              "value"    : role_quotes,
+                                                                              "format"   : format_data[index]})
+        return worksheet
+
+    def hash(self):
+        content = 0
+        for row in range(self.rows):
+            values = self.data[row]
+            for col in range(self.cols):
+                content ^= Hash.cell(row, col, values[col])
+        return content
+
+    def signature(scheme, colors, generator):
+        # Everything apart from the cells that affects the exported files,
+        # including the font table the .svg and .xlsx column widths use
+        names = list(scheme.styles) + ["light"]
+        return f'{generator}|{METRICS_FINGERPRINT}|{scheme.text()}|{"|".join(f"{name}={colors.get(name)}" for name in names)}'
+
+    def digest(self, generator=GENERATOR):
+        return Hash.digest(self.hash(), Matrix.signature(self.scheme, self.colors, generator))
+
+    def targets(filename):
+        # Files written when a chart is saved
+        return [filename, filename.replace(".html", ".xlsx"), filename.replace(".html", ".svg")]
+
+    def export(self, target, generator, metrics):
+        if target.endswith(".xlsx"):
+            self.write_excel(target, metrics)
+        elif target.endswith(".svg"):
+            self.write_svg(target, metrics)
+        else:
+            self.write(target, generator)
+
+    def save(self, filename, generator, metrics, digest=None, targets=None):
+        # Writes the .html, .xlsx and .svg files (or just targets) skipping
+        # any that already hold this content, returns the files written
+        if digest == None:
+            digest = self.digest(generator)
+        if targets == None:
+            targets = Matrix.targets(filename)
+        hashes = Hash.load(filename)
+        written = []
+        for target in targets:
+            if not Hash.fresh(hashes, target, digest):
+                self.export(target, generator, metrics)
+                Hash.stamp(hashes, target, digest)
+                written.append(target)
+        if len(written):
+            Hash.save(filename, hashes)
+        return written
+
+    def sheet_name(text):
+        # Excel limits worksheet names to 31 characters excluding []:*?/\
+        for char in '[]:*?/\\':
+            text = text.replace(char, "_")
+        text = text.strip("'")[:31]
+        if text == "":
+            text = "Sheet1"
+        return text
+
+    def write(self, filename, generator=GENERATOR):
+        with open(filename, "w") as f:
+            f.write(self.html(generator))
+
+    def write_svg(self, filename, metrics):
+        with open(filename, "w") as f:
+            f.write(self.svg(metrics))
+
+    def write_excel(self, filename, metrics):
+        self.excel(filename, metrics)
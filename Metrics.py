@@ -0,0 +1,135 @@
+########################################################################
+#
+# RACI
+#
+# A tool to create RACI responsibility assignment matricies.
+#
+# https://github.com/marjohloo/RACI
+#
+# Copyright 2022 Martin Looker
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################
+
+# Package imports
+import hashlib
+import json
+import os
+import threading
+from   collections import OrderedDict
+
+# Character advance widths for printable ASCII (space to tilde) in 1/1000
+# of an em, taken from the standard Helvetica/Arial font metrics so text
+# can be measured without a display
+FONT_WIDTHS = {
+    "Arial" : [
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+    ],
+    "Arial-Bold" : [
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+        975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+        333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+        611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584
+    ]
+}
+# Width used for characters outside the table (accented letters etc.)
+FONT_WIDTH_DEFAULT = 556
+# Maximum number of measurements retained
+METRICS_SIZE = 65536
+# Measurements persist between runs in this file
+METRICS_FILE = os.path.join(os.path.expanduser("~"), ".raci_metrics.json")
+# Saved measurements are only used while the font table is unchanged
+METRICS_FINGERPRINT = hashlib.blake2b(json.dumps([FONT_WIDTHS, FONT_WIDTH_DEFAULT], sort_keys=True).encode("utf-8"),
+                                      digest_size=8).hexdigest()
+# Excel column widths are in units of the default font's digit width (7px)
+EXCEL_DIGIT = 7
+EXCEL_PAD   = 5
+EXCEL_SIZE  = 11 * 96 / 72
+
+class Metrics:
+
+    def __init__(self, filename=METRICS_FILE, size=METRICS_SIZE):
+        self.filename = filename
+        self.size     = size
+        self.cache    = OrderedDict()
+        self.dirty    = False
+        self.lock     = threading.Lock()
+        self.tables   = {}
+        for font, widths in FONT_WIDTHS.items():
+            self.tables[font] = {chr(32+index): width for index, width in enumerate(widths)}
+        self.load()
+
+    def width(self, text, size=14, font="Arial"):
+        # Measured text width in pixels, from the cache if possible
+        key = (font, size, text)
+        with self.lock:
+            width = self.cache.get(key)
+            if width is None:
+                width = self.measure(text, size, font)
+                self.cache[key] = width
+                self.dirty = True
+                if len(self.cache) > self.size:
+                    self.cache.popitem(last=False)
+            else:
+                self.cache.move_to_end(key)
+        return width
+
+    def measure(self, text, size=14, font="Arial"):
+        # Uncached measurement from the font table
+        table = self.tables.get(font, self.tables["Arial"])
+        total = 0
+        for char in text:
+            total += table.get(char, FONT_WIDTH_DEFAULT)
+        return total * size / 1000
+
+    def excel(self, text, bold=False):
+        # Width of text in Excel column units
+        font = "Arial"
+        if bold:
+            font = "Arial-Bold"
+        return (self.width(text, EXCEL_SIZE, font) + EXCEL_PAD) / EXCEL_DIGIT
+
+    def load(self):
+        self.dirty = False
+        if self.filename != "" and os.path.isfile(self.filename):
+            try:
+                with open(self.filename, "r") as f:
+                    saved = json.load(f)
+                # Measurements from another font table are discarded
+                if saved.get("fingerprint") == METRICS_FINGERPRINT:
+                    for font, size, text, width in saved["entries"][-self.size:]:
+                        self.cache[(font, size, text)] = width
+            except (OSError, ValueError, TypeError, AttributeError, KeyError):
+                # A damaged cache is simply rebuilt
+                self.cache.clear()
+
+    def save(self):
+        if self.dirty and self.filename != "":
+            with self.lock:
+                entries = [[font, size, text, width] for (font, size, text), width in self.cache.items()]
+            try:
+                with open(self.filename + ".tmp", "w") as f:
+                    json.dump({"fingerprint" : METRICS_FINGERPRINT, "entries" : entries}, f)
+                os.replace(self.filename + ".tmp", self.filename)
+                self.dirty = False
+            except OSError:
+                pass
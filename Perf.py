@@ -0,0 +1,130 @@
+########################################################################
+#
+# RACI
+#
+# A tool to create RACI responsibility assignment matricies.
+#
+# https://github.com/marjohloo/RACI
+#
+# Copyright 2022 Martin Looker
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################
+
+# Package imports
+import cProfile
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import time
+from   collections import deque
+
+# Timers and counters for the main operations. Disabled unless the RACI_PERF
+# environment variable is set (or --perf is given), when disabled a timed
+# function costs one extra test per call.
+
+PERF_WINDOW = 1000
+
+log = logging.getLogger("raci")
+
+class Perf:
+
+    enabled  = os.environ.get("RACI_PERF", "") not in ("", "0")
+    stats    = {}
+    lock     = threading.Lock()
+    profiler = None
+
+    def timed(name):
+        # Decorator recording each call's duration under name
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not Perf.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    Perf.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def record(name, seconds):
+        with Perf.lock:
+            stat = Perf.stats.get(name)
+            if stat == None:
+                stat = {"count" : 0, "total" : 0.0, "min" : seconds, "max" : seconds, "recent" : deque(maxlen=PERF_WINDOW)}
+                Perf.stats[name] = stat
+            stat["count"] += 1
+            stat["total"] += seconds
+            if seconds < stat["min"]:
+                stat["min"] = seconds
+            if seconds > stat["max"]:
+                stat["max"] = seconds
+            stat["recent"].append(seconds)
+        log.debug('%s %.3f ms', name, seconds*1000)
+
+    def reset():
+        with Perf.lock:
+            Perf.stats.clear()
+
+    def summary():
+        # Per operation totals plus a power of two histogram (in
+        # microseconds) of the most recent calls
+        result = {}
+        with Perf.lock:
+            for name, stat in Perf.stats.items():
+                recent = sorted(stat["recent"])
+                histogram = {}
+                for seconds in recent:
+                    bucket = 1 << max(0, math.ceil(math.log2(max(seconds * 1e6, 1))))
+                    histogram[bucket] = histogram.get(bucket, 0) + 1
+                result[name] = {
+                    "count"      : stat["count"],
+                    "total_ms"   : stat["total"] * 1000,
+                    "mean_ms"    : stat["total"] * 1000 / stat["count"],
+                    "min_ms"     : stat["min"] * 1000,
+                    "max_ms"     : stat["max"] * 1000,
+                    "p50_ms"     : recent[len(recent)//2] * 1000,
+                    "p95_ms"     : recent[min(len(recent)-1, int(len(recent)*0.95))] * 1000,
+                    "histogram"  : {f'<={bucket}us' : count for bucket, count in sorted(histogram.items())}
+                }
+        return result
+
+    def report():
+        lines = [f'{"Operation":20} {"Count":>8} {"Mean ms":>10} {"P95 ms":>10} {"Max ms":>10} {"Total ms":>10}']
+        for name, stat in sorted(Perf.summary().items()):
+            lines.append(f'{name:20} {stat["count"]:8} {stat["mean_ms"]:10.3f} {stat["p95_ms"]:10.3f} {stat["max_ms"]:10.3f} {stat["total_ms"]:10.1f}')
+        return "\n".join(lines)
+
+    def dump(filename):
+        with open(filename, "w") as f:
+            json.dump({"time" : time.strftime("%Y-%m-%dT%H:%M:%S"), "stats" : Perf.summary()}, f, indent=2)
+
+    def profile_start():
+        if Perf.profiler == None:
+            Perf.profiler = cProfile.Profile()
+            Perf.profiler.enable()
+
+    def profile_stop(filename):
+        # Stops profiling and saves the stats for pstats or snakeviz
+        if Perf.profiler != None:
+            Perf.profiler.disable()
+            if len(filename):
+                Perf.profiler.dump_stats(filename)
+            Perf.profiler = None
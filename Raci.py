@@ -24,11 +24,12 @@
 ########################################################################
 
 # Package imports
+import argparse
 import json
+import logging
 import os
-import math
 import webbrowser
-from   tkinter import filedialog
+from   tkinter import TclError, filedialog
 
 # https://ttkbootstrap.readthedocs.io/en/latest/
 # python -m pip install ttkbootstrap
@@ -36,31 +37,41 @@ import ttkbootstrap as ttk
 from   ttkbootstrap.constants import *
 from   ttkbootstrap.dialogs   import Messagebox
 
-# https://xlsxwriter.readthedocs.io/getting_started.html
-# pip install XlsxWriter
-import xlsxwriter
-from   xlsxwriter.utility import xl_rowcol_to_cell
-
 # Project imports
-from Cell import *
+from Book    import *
+from Cell    import *
+from Diff    import *
+from Matrix  import *
+from Metrics import *
+from Perf    import *
+from Scheme  import *
+from View    import *
 
 # Useful characters ← ↑ → ↓ × ▲ ► ▼ ◄ ˂ ˃ ˄ ˅
 
 class Raci:
 
-    def __init__(self):
+    def __init__(self, mainloop=True):
         # Initialise data
         self.title = "RACI"
         self.version = "v0.0.1"
-        self.roles  = [""         , "Responsible", "Accountable", "Consulted", "Informed"]
-        self.styles = ["secondary", "danger"     , "warning"    , "info"     , "success" ]
+        self.schemes = Scheme.load()
+        self.scheme  = self.schemes[SCHEME_DEFAULT]
         self.cells = {}
+        # Content hash of the cells, kept up to date by each Cell
+        self.hash = 0
         self.rows = 0
         self.cols = 0
         self.saved = True
         self.filename = ""
+        # Workbook being edited and its displayed sheet, None for a single chart
+        self.book = None
+        self.sheet = None
+        self.sheet_digest = None
         #self.view_full = True
         self.view = "min"
+        # Text measurements for exported column widths
+        self.metrics = Metrics()
         # Invalidate outer frame
         #self.frame_table = None
         # Initialise window
@@ -71,6 +82,8 @@ class Raci:
         self.window.columnconfigure(0, weight=1)
         # Extract colors from window theme
         self.colors = self.window.style.colors
+        # Build the styles cells switch between up front
+        self.style_cache_build()
         # Create window menu
         self.window.option_add("*tearOff", FALSE)
         #self.toplevel = ttk.Toplevel(self.window)
@@ -92,20 +105,44 @@ class Raci:
         self.menu.entryconfigure("View Excel...", state=DISABLED)
         self.window.bind("<Control-e>", lambda *_: self.menu_view_excel())
         self.menu.add_separator()
+        self.menu.add_command(label="Compare...", command=self.menu_compare)
+        self.menu.add_command(label="Clear Compare", command=self.menu_compare_clear)
+        self.menu.entryconfigure("Clear Compare", state=DISABLED)
+        self.menu.add_command(label="Paste Table", accelerator="Ctrl+Shift+V", command=self.menu_paste)
+        self.window.bind("<Control-V>", lambda *_: self.menu_paste())
+        self.menu.add_command(label="Transpose", command=self.menu_transpose)
+        self.menu.add_command(label="Export People...", command=self.menu_export_people)
+        self.menu.add_command(label="Export Roles...", command=self.menu_export_roles)
+        self.menu.add_separator()
+        self.scheme_var  = ttk.StringVar(value=self.scheme.name)
+        self.menu_scheme = ttk.Menu(self.menu)
+        self.menu.add_cascade(menu=self.menu_scheme, label="Scheme")
+        for name in self.schemes:
+            self.menu_scheme.add_radiobutton(label=name, value=name, variable=self.scheme_var, command=self.menu_scheme_set)
+        self.menu.add_command(label="Performance...", command=self.menu_perf)
+        self.menu.add_separator()
         self.menu.add_command(label="View Manual...", accelerator="F1", command=self.menu_view_manual)
         self.window.bind("<F1>",        lambda *_: self.menu_view_manual())
         self.menu.add_command(label="View Homepage...", accelerator="Ctrl+G", command=self.menu_view_homepage)
         self.window.bind("<Control-g>", lambda *_: self.menu_view_homepage())
+        self.sheet_var   = ttk.IntVar(value=0)
+        self.menu_sheets = ttk.Menu(self.menubar)
+        self.menubar.add_cascade(menu=self.menu_sheets, label="Sheets")
+        self.sheets_menu_build()
         self.window["menu"] = self.menubar
         # Start with new file
         self.file_new()
-        # Start main loop
-        self.window.mainloop()
+        # Start main loop (not when driven by another program)
+        if mainloop:
+            self.window.mainloop()
 
     def menu_new(self):
         do_new = False
+        # Editing a workbook, whatever the size of the displayed sheet
+        if self.book != None:
+            do_new = self.discard_ok("File > New")
         # Empty so need to create
-        if self.rows < 1 or self.cols < 1:
+        elif self.rows < 1 or self.cols < 1:
             do_new = True
         # Unsaved user data is present
         elif self.rows > 1 or self.cols > 1:
@@ -118,12 +155,16 @@ class Raci:
             else:
                 do_new = True
         if do_new:
+            self.book_close()
             self.file_new()
 
     def menu_open(self):
         do_open = False
+        # Editing a workbook, whatever the size of the displayed sheet
+        if self.book != None:
+            do_open = self.discard_ok("File > Open")
         # Unsaved user data is present
-        if self.rows > 1 or self.cols > 1:
+        elif self.rows > 1 or self.cols > 1:
             if self.saved == False:
                 confirm_new = Messagebox.show_question(title   = "File > Open",
                                                        message = "Discard unsaved data and open file?",
@@ -141,28 +182,431 @@ class Raci:
                                                   defaultextension = ".html",
                                                   parent           = self.window)
             if len(filename):
+                self.book_close()
                 self.file_read(filename)
 
     def menu_save(self):
+        # Editing a workbook ?
+        if self.book != None:
+            self.menu_book_save()
         # Don't have a current filename ?
-        if self.filename == "":
+        elif self.filename == "":
             # Do a save as instead
             self.menu_save_as()
         # Have a current filename ?
         else:
-            self.file_write(self.filename)
-            self.file_write_excel(self.filename.replace(".html", ".xlsx"))
-            self.file_write_svg(self.filename.replace(".html", ".svg"))
+            self.file_save(self.filename)
 
     def menu_save_as(self):
+        if self.book != None:
+            self.menu_book_save_as()
+            return
         filename = filedialog.asksaveasfilename(title            = "File > Save As",
                                                 filetypes        = [("HTML Files", ".html")],
                                                 defaultextension = ".html",
                                                 parent           = self.window)
         if len(filename):
-            self.file_write(filename)
-            self.file_write_excel(filename.replace(".html", ".xlsx"))
-            self.file_write_svg(filename.replace(".html", ".svg"))
+            self.file_save(filename)
+
+    def menu_compare(self):
+        filename = filedialog.askopenfilename(title            = "File > Compare",
+                                              filetypes        = [("HTML Files", ".html")],
+                                              defaultextension = ".html",
+                                              parent           = self.window)
+        if len(filename):
+            matrix = Matrix.read(filename)
+            if matrix == None:
+                Messagebox.show_error(title   = "File > Compare",
+                                      message = "RACI data not found in compared file!",
+                                      parent  = self.window)
+            else:
+                self.compare(Diff(matrix, self.matrix()))
+
+    def menu_compare_clear(self):
+        self.compare(None)
+
+    def compare(self, diff):
+        # Overlay the changes from a compared file onto the displayed cells
+        for cell in self.cells.values():
+            if cell.mark_style != None:
+                cell.mark(None)
+        self.menu.entryconfigure("Clear Compare", state=DISABLED)
+        if diff != None:
+            side = diff.b
+            for row_key in diff.rows_added:
+                self.cells[Cell.key(side.row_index[row_key], 0)].mark("success")
+            for row_key in diff.rows_moved:
+                self.cells[Cell.key(side.row_index[row_key], 0)].mark("warning")
+            for col_key in diff.cols_added:
+                self.cells[Cell.key(0, side.col_index[col_key])].mark("success")
+            for col_key in diff.cols_moved:
+                self.cells[Cell.key(0, side.col_index[col_key])].mark("warning")
+            for row_key, col_key, value_a, value_b in diff.cells:
+                self.cells[Cell.key(side.row_index[row_key], side.col_index[col_key])].mark("warning")
+            if diff.title != None:
+                self.cells[Cell.key(0, 0)].mark("warning")
+            self.menu.entryconfigure("Clear Compare", state=NORMAL)
+            report = diff.report()
+            if len(report) == 0:
+                message = "No differences found."
+            else:
+                message = f'{len(report)} differences found.'
+                if len(diff.rows_removed) or len(diff.cols_removed):
+                    message += f'\n{len(diff.rows_removed)} rows and {len(diff.cols_removed)} columns are only in the compared file.'
+            Messagebox.show_info(title   = "File > Compare",
+                                 message = message,
+                                 parent  = self.window)
+
+    def menu_paste(self):
+        # Paste a block copied from a spreadsheet at the focused cell
+        try:
+            text = self.window.clipboard_get()
+        except TclError:
+            text = ""
+        block = Matrix.tsv(text)
+        if len(block) == 0:
+            Messagebox.show_info(title   = "File > Paste Table",
+                                 message = "No table found on the clipboard.",
+                                 parent  = self.window)
+        else:
+            row, col = self.focus_cell()
+            self.paste(block, row, col)
+
+    def focus_cell(self):
+        # (row, col) of the cell holding the keyboard focus, (0, 0) if none
+        widget = self.window.focus_get()
+        while widget != None and widget.master != None and widget.master is not self.window:
+            widget = widget.master
+        if widget != None and widget.master is self.window:
+            info = widget.grid_info()
+            if "row" in info:
+                return int(info["row"]), int(info["column"])
+        return 0, 0
+
+    @Perf.timed("paste")
+    def paste(self, block, row=0, col=0):
+        # As Matrix.paste but for the cells. The chart is grown once, new
+        # cells are created with their pasted values and gridded together
+        # once they all exist, and only the header cells next to the old
+        # edges are gridded again.
+        rows_old = self.rows
+        cols_old = self.cols
+        values, rows, cols = Matrix.paste_values(self.scheme, block, row, col, rows_old, cols_old)
+        # Existing cells
+        for (cell_row, cell_col), value in values.items():
+            if cell_row < rows_old and cell_col < cols_old:
+                cell = self.cells[Cell.key(cell_row, cell_col)]
+                if cell.var.get() != value:
+                    cell.var.set(value)
+                    if cell.type == "data":
+                        cell.data_style(self.scheme.id(value))
+        # New cells
+        self.rows = rows
+        self.cols = cols
+        cells = []
+        for cell_row in range(rows):
+            col_first = 0
+            if cell_row < rows_old:
+                col_first = cols_old
+            for cell_col in range(col_first, cols):
+                if cell_row == 0:
+                    type = "col"
+                elif cell_col == 0:
+                    type = "row"
+                else:
+                    type = "data"
+                value = values.get((cell_row, cell_col))
+                if value == None:
+                    value = Matrix.default(cell_row, cell_col)
+                cell = Cell(self, self.window, cell_row, cell_col, type, value, show=False)
+                self.cells[Cell.key(cell_row, cell_col)] = cell
+                cells.append(cell)
+        for cell in cells:
+            if cell.type == "data":
+                cell.frame.grid(column=cell.col, row=cell.row, sticky=(W, S, E))
+        # Header cells, with the up and down controls of the new and
+        # previously last header cells
+        for cell_row in range(max(1, rows_old-1), rows):
+            self.cells[Cell.key(cell_row, 0)].grid()
+        for cell_col in range(max(1, cols_old-1), cols):
+            self.cells[Cell.key(0, cell_col)].grid()
+        self.saved = False
+
+    def menu_transpose(self):
+        # Swap rows and columns keeping the current file
+        filename = self.filename
+        self.matrix_load(Transpose(self.matrix()))
+        self.filename_set(filename)
+        self.saved = False
+
+    def menu_export_people(self):
+        folder = filedialog.askdirectory(title  = "File > Export People",
+                                         parent = self.window)
+        if len(folder):
+            matrix = self.matrix()
+            self.views_save(folder, [Person(matrix, col, assigned=True) for col in range(1, matrix.cols)])
+
+    def menu_export_roles(self):
+        folder = filedialog.askdirectory(title  = "File > Export Roles",
+                                         parent = self.window)
+        if len(folder):
+            matrix = self.matrix()
+            self.views_save(folder, [Role(matrix, [role]) for role in self.scheme.roles[1:]])
+
+    def views_save(self, folder, views):
+        # Saves each view as .html, .xlsx and .svg files named by its title,
+        # numbered when titles are the same (ignoring case, as Windows does)
+        generator = f'{self.title} {self.version}'
+        written = 0
+        names = set()
+        for view in views:
+            base = filename_safe(view.value(0, 0))
+            name = base
+            count = 1
+            while name.lower() in names:
+                count += 1
+                name = f'{base} ({count})'
+            names.add(name.lower())
+            filename = os.path.join(folder, name + ".html")
+            written += len(view.save(filename, generator, self.metrics))
+        self.metrics.save()
+        Messagebox.show_info(title   = "File > Export",
+                             message = f'{len(views)} charts exported, {written} files written.',
+                             parent  = self.window)
+
+    def menu_scheme_set(self):
+        scheme = self.schemes[self.scheme_var.get()]
+        if scheme is not self.scheme:
+            self.scheme_set(scheme)
+            self.saved = False
+
+    def scheme_set(self, scheme):
+        # Cells keep their text, values not in the new scheme show as blank.
+        # A file's scheme with different roles to the configured scheme of
+        # the same name is added as "NAME (2)" rather than replacing it.
+        key = scheme.name
+        count = 1
+        while key in self.schemes and self.schemes[key].text() != scheme.text():
+            count += 1
+            key = f'{scheme.name} ({count})'
+        if key not in self.schemes:
+            self.menu_scheme.add_radiobutton(label=key, value=key, variable=self.scheme_var, command=self.menu_scheme_set)
+            self.schemes[key] = scheme
+        self.scheme = self.schemes[key]
+        self.scheme_var.set(key)
+        self.role_styles_build()
+        for cell in self.cells.values():
+            if cell.type == "data":
+                cell.data_style(scheme.id(cell.var.get()))
+
+    def menu_perf(self):
+        dialog = ttk.Toplevel(self.window)
+        dialog.title("Performance")
+        text = ttk.Text(dialog, width=84, height=20, font="TkFixedFont", wrap="none")
+        text.grid(column=0, row=0, columnspan=5, sticky=(N, W, S, E), padx=PAD, pady=PAD)
+        def refresh():
+            text.configure(state="normal")
+            text.delete("1.0", "end")
+            if Perf.enabled:
+                text.insert("end", Perf.report())
+            else:
+                text.insert("end", "Timing is off, press Enable then repeat the slow operation.")
+            text.configure(state="disabled")
+            enable.configure(text="Disable" if Perf.enabled else "Enable")
+            profile.configure(text="Stop Profile..." if Perf.profiler != None else "Start Profile")
+        def toggle():
+            Perf.enabled = not Perf.enabled
+            refresh()
+        def reset():
+            Perf.reset()
+            refresh()
+        def save():
+            filename = filedialog.asksaveasfilename(title            = "Performance > Save",
+                                                    filetypes        = [("JSON Files", ".json")],
+                                                    defaultextension = ".json",
+                                                    parent           = dialog)
+            if len(filename):
+                Perf.dump(filename)
+        def profile_toggle():
+            if Perf.profiler == None:
+                Perf.profile_start()
+            else:
+                filename = filedialog.asksaveasfilename(title            = "Performance > Save Profile",
+                                                        filetypes        = [("Profile Files", ".prof")],
+                                                        defaultextension = ".prof",
+                                                        parent           = dialog)
+                Perf.profile_stop(filename)
+            refresh()
+        enable  = ttk.Button(dialog, command=toggle, bootstyle="primary")
+        profile = ttk.Button(dialog, command=profile_toggle, bootstyle="primary")
+        enable.grid(column=0, row=1, sticky=(W, E), padx=PAD, pady=PAD)
+        ttk.Button(dialog, text="Refresh",    command=refresh, bootstyle="info").grid(column=1, row=1, sticky=(W, E), padx=PAD, pady=PAD)
+        ttk.Button(dialog, text="Reset",      command=reset,   bootstyle="warning").grid(column=2, row=1, sticky=(W, E), padx=PAD, pady=PAD)
+        ttk.Button(dialog, text="Save JSON...", command=save,  bootstyle="success").grid(column=3, row=1, sticky=(W, E), padx=PAD, pady=PAD)
+        profile.grid(column=4, row=1, sticky=(W, E), padx=PAD, pady=PAD)
+        refresh()
+
+    def sheets_menu_build(self):
+        # Workbook commands then a radio button for each sheet, indented
+        # below its parent
+        self.menu_sheets.delete(0, "end")
+        self.menu_sheets.add_command(label="New Workbook", command=self.menu_book_new)
+        self.menu_sheets.add_command(label="Open Workbook...", command=self.menu_book_open)
+        self.menu_sheets.add_command(label="Save Workbook", command=self.menu_book_save)
+        self.menu_sheets.add_command(label="Save Workbook As...", command=self.menu_book_save_as)
+        self.menu_sheets.add_separator()
+        self.menu_sheets.add_command(label="Add Sheet", command=self.menu_sheet_add)
+        self.menu_sheets.add_command(label="Add Child Sheet", command=lambda: self.menu_sheet_add(child=True))
+        self.menu_sheets.add_command(label="Remove Sheet", command=self.menu_sheet_remove)
+        if self.book == None:
+            for label in ("Save Workbook", "Save Workbook As...", "Add Sheet", "Add Child Sheet", "Remove Sheet"):
+                self.menu_sheets.entryconfigure(label, state=DISABLED)
+        else:
+            if len(self.book.sheets) < 2:
+                self.menu_sheets.entryconfigure("Remove Sheet", state=DISABLED)
+            self.menu_sheets.add_separator()
+            for sheet, depth in self.book.order():
+                self.menu_sheets.add_radiobutton(label=f'{"    " * depth}{sheet.title}', value=sheet.id, variable=self.sheet_var,
+                                                 command=lambda sheet=sheet: self.sheet_show(sheet))
+            if self.sheet != None:
+                self.sheet_var.set(self.sheet.id)
+
+    def discard_ok(self, title):
+        # True when nothing is unsaved or the user agrees to lose it
+        if self.saved and (self.book == None or not self.book.dirty()):
+            return True
+        confirm = Messagebox.show_question(title   = title,
+                                           message = "Discard unsaved data?",
+                                           parent  = self.window)
+        return confirm == "Yes"
+
+    def menu_book_new(self):
+        # Start a workbook with the displayed chart as its first sheet
+        if self.book != None and not self.discard_ok("Sheets > New Workbook"):
+            return
+        self.book = Book()
+        self.sheet = self.book.add(self.matrix())
+        self.sheet_digest = self.sheet_digest_get()
+        self.filename_set("")
+        self.saved = False
+        self.sheets_menu_build()
+
+    def menu_book_open(self):
+        if self.discard_ok("Sheets > Open Workbook"):
+            filename = filedialog.askopenfilename(title            = "Sheets > Open Workbook",
+                                                  filetypes        = [("RACI Workbooks", ".racibook")],
+                                                  defaultextension = ".racibook",
+                                                  parent           = self.window)
+            if len(filename):
+                self.book_read(filename)
+
+    def menu_book_save(self):
+        if self.book != None:
+            if self.book.filename == "":
+                self.menu_book_save_as()
+            else:
+                self.book_save(self.book.filename)
+
+    def menu_book_save_as(self):
+        if self.book != None:
+            filename = filedialog.asksaveasfilename(title            = "Sheets > Save Workbook As",
+                                                    filetypes        = [("RACI Workbooks", ".racibook")],
+                                                    defaultextension = ".racibook",
+                                                    parent           = self.window)
+            if len(filename):
+                self.book_save(filename)
+
+    def menu_sheet_add(self, child=False):
+        # New sheet after the displayed one, or below it for a child
+        if self.book != None:
+            self.sheet_store()
+            if child:
+                parent = self.sheet
+            else:
+                parent = self.book.sheet(self.sheet.parent)
+            self.sheet_show(self.book.add(Matrix(), parent))
+
+    def menu_sheet_remove(self):
+        if self.book != None and len(self.book.sheets) > 1:
+            confirm = Messagebox.show_question(title   = "Sheets > Remove Sheet",
+                                               message = f'Remove "{self.sheet.title}" and the sheets below it?',
+                                               parent  = self.window)
+            if confirm == "Yes":
+                parent = self.book.sheet(self.sheet.parent)
+                self.book.remove(self.sheet)
+                self.sheet = None
+                if parent == None:
+                    parent = self.book.order()[0][0]
+                self.sheet_show(parent)
+
+    @Perf.timed("book_read")
+    def book_read(self, filename):
+        try:
+            book = Book.open(filename)
+        except (OSError, ValueError):
+            book = None
+        if book == None or len(book.sheets) == 0:
+            Messagebox.show_error(title   = "Sheets > Open Workbook",
+                                  message = "RACI workbook not found in opened file!",
+                                  parent  = self.window)
+        else:
+            self.book = book
+            self.sheet = None
+            self.sheet_show(book.order()[0][0])
+            if self.sheet == None:
+                self.book_close()
+
+    @Perf.timed("book_save")
+    def book_save(self, filename):
+        self.sheet_store()
+        # Only rewritten when changed or saved somewhere new
+        if self.book.dirty() or self.book.digest == None or filename != self.book.filename:
+            self.book.save(filename, f'{self.title} {self.version}')
+        if self.book.export(self.metrics):
+            self.metrics.save()
+        self.saved = True
+        self.filename_set("")
+        self.sheets_menu_build()
+
+    def book_close(self):
+        # Back to editing a single chart
+        if self.book != None:
+            self.book = None
+            self.sheet = None
+            self.sheets_menu_build()
+
+    @Perf.timed("sheet_show")
+    def sheet_show(self, sheet):
+        # Only the displayed sheet has cells, the others stay in the
+        # workbook file (or as a Matrix while they have unsaved changes)
+        if sheet is self.sheet:
+            return
+        self.sheet_store()
+        matrix = self.book.load(sheet)
+        if matrix == None:
+            Messagebox.show_error(title   = "Sheets",
+                                  message = "RACI data not found in sheet!",
+                                  parent  = self.window)
+            self.sheets_menu_build()
+            return
+        self.sheet = sheet
+        self.matrix_load(matrix)
+        self.book.unload(sheet)
+        self.sheet_digest = self.sheet_digest_get()
+        self.filename_set("")
+        self.saved = not self.book.dirty()
+        self.sheets_menu_build()
+
+    def sheet_digest_get(self):
+        return Hash.digest(self.hash, self.scheme.text())
+
+    def sheet_store(self):
+        # Keep changes to the displayed sheet in the workbook until saved
+        if self.book != None and self.sheet != None:
+            digest = self.sheet_digest_get()
+            if digest != self.sheet_digest:
+                self.book.put(self.sheet, self.matrix())
+                self.sheet_digest = digest
 
     def menu_view_html(self):
         self.file_view_html()
@@ -185,105 +629,70 @@ class Raci:
                     cell.destroy()
         self.rows = 0
         self.cols = 0
+        self.menu.entryconfigure("Clear Compare", state=DISABLED)
         cell_key = Cell.key(0, 0)
         if cell_key not in self.cells:
             self.cells[cell_key] = Cell(self, self.window, 0, 0, "origin", "TITLE")
         self.rows += 1
         self.cols += 1
+        # New charts use the default scheme
+        self.scheme_set(self.schemes[SCHEME_DEFAULT])
         # Clear filename
         self.filename_set("")
         # Treat as saved (there is nothing there anyway)
-        self.saved == True
+        self.saved = True
 
+    @Perf.timed("file_read")
     def file_read(self, filename):
         if len(filename) > 0:
-            in_table = False
-            out_table = False
-            title = "TITLE"
-            data = []
-            rows = 0
-            cols = 0
-            with open(filename, "r") as f:
-                for line in f:
-                    if in_table == False:
-                        search = "<title>"
-                        if search in line:
-                            index = line.find(search)
-                            if index >= 0:
-                                line = line[index+len(search):]
-                                search = "</title>"
-                                if search in line:
-                                    index = line.find(search)
-                                    if index >= 0:
-                                        line = line[:index]
-                                        line = line.strip()
-                                        title = line
-                        search = '<table id="RACI"'
-                        if search in line:
-                            in_table = True
-                    elif out_table == False:
-                        if '<tr' in line:
-                            data.append([])
-                            rows += 1
-                        elif '<th' in line:
-                            index = line.find('<th')
-                            start = line.find('>', index+len('<th'))+1
-                            end   = line.find('</th>')
-                            line  = line[start:end].strip()
-                            data[-1].append(line)
-                            if rows == 1:
-                                cols += 1
-                        elif '<td' in line:
-                            index = line.find('<td')
-                            start = line.find('>', index+len('<td'))+1
-                            end   = line.find('</td>')
-                            line  = line[start:end].strip()
-                            data[-1].append(line)
-                            if rows == 1:
-                                cols += 1
-                        elif '</table' in line:
-                            out_table = True
-                f.close()
-            if False:
-                print(f'file_read({filename})')
-                print(f'    title="{title}"')
-                print(f'    out_table={out_table}')
-                print(f'    rows={rows}')
-                print(f'    cols={cols}')
-                print(f'    data[{len(data)}]={data}')
-            if len(data) == 0 or out_table == False:
+            matrix = Matrix.read(filename)
+            if matrix == None:
                 confirm_new = Messagebox.show_error(title   = "File > Open",
                                                     message = "RACI data not found in opened file!",
                                                     parent  = self.window)
             else:
-                # Clear existing data
-                self.file_new()
-                # Rebuild new data
-                for row in range(rows):
-                    for col in range(cols):
-                        cell_key = Cell.key(row, col)
-                        if row == 0 and col == 0:
-                            if cell_key in self.cells:
-                                self.cells[cell_key].var.set(title)
-                            else:
-                                self.cells[cell_key] = Cell(self, self.window, row, col, "origin", title)
-                        elif row == 0:
-                            if cell_key not in self.cells:
-                                self.cells[cell_key] = Cell(self, self.window, row, col, "col", data[row][col])
-                        elif col == 0:
-                            if cell_key not in self.cells:
-                                self.cells[cell_key] = Cell(self, self.window, row, col, "row", data[row][col])
-                        else:
-                            if cell_key not in self.cells:
-                                self.cells[cell_key] = Cell(self, self.window, row, col, "data", data[row][col])
-                # Update counts
-                self.rows = rows
-                self.cols = cols
+                self.matrix_load(matrix)
                 # Retain filename
                 self.filename_set(filename)
                 # Data is saved
                 self.saved = True
 
+    @Perf.timed("matrix_load")
+    def matrix_load(self, matrix):
+        # Clear existing data
+        self.file_new()
+        self.scheme_set(matrix.scheme)
+        # Rebuild new data
+        for row in range(matrix.rows):
+            for col in range(matrix.cols):
+                cell_key = Cell.key(row, col)
+                if row == 0 and col == 0:
+                    if cell_key in self.cells:
+                        self.cells[cell_key].var.set(matrix.value(row, col))
+                    else:
+                        self.cells[cell_key] = Cell(self, self.window, row, col, "origin", matrix.value(row, col))
+                elif row == 0:
+                    if cell_key not in self.cells:
+                        self.cells[cell_key] = Cell(self, self.window, row, col, "col", matrix.value(row, col))
+                elif col == 0:
+                    if cell_key not in self.cells:
+                        self.cells[cell_key] = Cell(self, self.window, row, col, "row", matrix.value(row, col))
+                else:
+                    if cell_key not in self.cells:
+                        self.cells[cell_key] = Cell(self, self.window, row, col, "data", matrix.value(row, col))
+        # Update counts
+        self.rows = matrix.rows
+        self.cols = matrix.cols
+
+    def matrix(self):
+        # Snapshot of the displayed data for comparing and exporting
+        data = []
+        for row in range(self.rows):
+            data.append([self.cell_value(row, col) for col in range(self.cols)])
+        matrix = Matrix(self.cell_value(0, 0), data, self.scheme)
+        matrix.colors = self.colors
+        return matrix
+
     def cell_value(self, row, col):
         value = ""
         cell_key = Cell.key(row, col)
@@ -291,282 +700,55 @@ class Raci:
             value = self.cells[cell_key].var.get()
         return value
 
-    def cell_html(self, row, col, row_width):
-        cell_value = self.cell_value(row, col)
-        cell_html = '<'
-        if row == 0:
-            cell_html += 'th'
-        else:
-            cell_html += 'td'
-        if row == 0 and col == 0:
-            cell_html += ' class="left"'
-        elif row == 0:
-            pass
-        elif col == 0:
-            cell_html += ' class="left"'
-        else:
-            cell_class = "secondary"
-            if cell_value in self.roles:
-                index = self.roles.index(cell_value)
-                if index < len(self.styles):
-                    cell_class = self.styles[index]
-            cell_html += f' class="{cell_class}"'
-        if col > 0 and row == row_width:
-            cell_html += f' width="{int(100/(self.cols+1))}%"'
-        cell_html += f'>{cell_value}<'
-        if row == 0:
-            cell_html += '/th'
-        else:
-            cell_html += '/td'
-        cell_html += '>'
-        return cell_html
-
+    @Perf.timed("file_write")
     def file_write(self, filename):
         if len(filename) > 0:
-            with open(filename, "w") as f:
-                # Output header
-                f.write( '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.1//EN"\n')
-                f.write( '  "http://www.w3.org/TR/xhtml11/DTD/xhtml11.dtd">\n')
-                f.write( '<html xmlns="http://www.w3.org/1999/xhtml">\n')
-                f.write( '  <head>\n')
-                f.write(f'    <title>{self.cell_value(0,0)}</title>\n')
-                f.write(f'    <meta name="description" content="{self.cell_value(0,0)}" />\n')
-                f.write(f'    <meta name="generator"   content="{self.title} {self.version}" />\n')
-                f.write(f'    <link rel="help"         href="https://github.com/marjohloo/RACI" />\n')
-                f.write(f'    <link rel="author"       href="https://github.com/marjohloo" />\n')
-                f.write(f'    <link rel="license"      href="https://www.gnu.org/licenses/gpl-3.0.html" />\n')
-                f.write( '    <style>\n')
-                f.write( '        body              { font-size: 10pt; font-family: Calibri,Arial,Helvetica,sans-serif; }\n')
-                f.write( '        div               { page-break-inside: avoid; }\n')
-                f.write( '        p                 { font-size: 10pt; }\n')
-                f.write( '        h1                { font-size: 16pt; font-weight: bold; }\n')
-                f.write( '        h2                { font-size: 12pt; font-weight: bold; /* page-break-before: always; */ }\n')
-                f.write( '        table, tr, th, td { font-size: 10pt; text-align: center; vertical-align: top; border: 1px solid black; border-collapse: collapse; padding: 2pt}\n')
-                f.write( '        .page             { page-break-before: always; }\n')
-                f.write( '        .left             { text-align: left; }\n')
-                f.write(f'        .primary          {{ background: {self.colors.get("primary")}; }}\n')
-                f.write(f'        .secondary        {{ background: {self.colors.get("secondary")}; }}\n')
-                f.write(f'        .success          {{ background: {self.colors.get("success")}; }}\n')
-                f.write(f'        .warning          {{ background: {self.colors.get("warning")}; }}\n')
-                f.write(f'        .primary          {{ background: {self.colors.get("primary")}; }}\n')
-                f.write(f'        .danger           {{ background: {self.colors.get("danger")}; }}\n')
-                f.write(f'        .info             {{ background: {self.colors.get("info")}; }}\n')
-                f.write( '    </style>\n')
-                f.write( '  </head>\n')
-                # Calculate column width percentage
-                col_width = int(100/(self.cols+1))
-                # Begin body
-                f.write( '  <body>\n')
-                f.write( '    <div>\n')
-                f.write(f'      <h1>{self.cell_value(0,0)}</h1>\n')
-                # Output table data
-                f.write('      <table id="RACI" width="100%">\n')
-                for row in range(self.rows):
-                    f.write('        <tr>\n')
-                    for col in range(self.cols):
-                        if row == 0 and col == 0:
-                            f.write('          <th></th>\n')
-                        else:
-                            f.write(f'          {self.cell_html(row, col, 0)}\n')
-                    f.write('        </tr>\n')
-                f.write('      </table>\n')
-                f.write('    </div>\n')
-                # Output individual data
-                if False:
-                    for col in range(1, self.cols):
-                        if col == 1:
-                            f.write('    <div class="page">\n')
-                        else:
-                            f.write('    <div>\n')
-                        f.write(f'      <h2>{self.cell_value(0,0)}: {self.cell_value(0, col)}</h2>\n')
-                        f.write( '      <table width="100%">\n')
-                        for row in range(1, self.rows):
-                            f.write( '        <tr>\n')
-                            f.write(f'          {self.cell_html(row, 0,   1)}\n')
-                            f.write(f'          {self.cell_html(row, col, 1)}\n')
-                            f.write( '        </tr>\n')
-                        f.write( '      </table>\n')
-                        f.write('    </div>\n')
-                # End file
-                f.write('  </body>\n')
-                f.write('</html>\n')
-                f.close()
-                # Retain filename
-                self.filename_set(filename)
-                # Data is saved
-                self.saved = True
-
+            self.matrix().write(filename, f'{self.title} {self.version}')
+            # Retain filename
+            self.filename_set(filename)
+            # Data is saved
+            self.saved = True
+
+    @Perf.timed("file_save")
+    def file_save(self, filename):
+        if len(filename) > 0:
+            generator = f'{self.title} {self.version}'
+            digest = Hash.digest(self.hash, Matrix.signature(self.scheme, self.colors, generator))
+            hashes = Hash.load(filename)
+            # Only snapshot and write when something is out of date
+            for target in Matrix.targets(filename):
+                if not Hash.fresh(hashes, target, digest):
+                    self.matrix().save(filename, generator, self.metrics, digest)
+                    self.metrics.save()
+                    break
+            # Retain filename
+            self.filename_set(filename)
+            # Data is saved
+            self.saved = True
+
+    @Perf.timed("file_write_svg")
     def file_write_svg(self, filename):
         if len(filename) > 0:
-            with open(filename, "w") as f:
-                # Get widths from biggest row/column titles
-                width_row = 12
-                width_col = 12
-                for row in range(self.rows):
-                    if len(self.cell_value(row, 0)) > width_row:
-                        width_row = len(self.cell_value(row, 0))
-                for col in range(1,self.cols):
-                    if len(self.cell_value(0, col)) > width_col:
-                        width_col = len(self.cell_value(0, col))
-                font_size = 14
-                width_col = math.ceil(width_col * (font_size*0.5)) + 6
-                width_row = math.ceil(width_row * (font_size*0.55)) + 6
-                h = font_size
-                h += 7
-                y = 1
-                image_w = width_row + (width_col*(self.cols-1)) + 2
-                image_h = (h*(self.rows)) + 2
-                # Output header
-                f.write(f'<svg version="1.1" width="{image_w}" height="{image_h}" xmlns="http://www.w3.org/2000/svg">\n')
-                for row in range(self.rows):
-                    x = 1
-                    for col in range(self.cols):
-                        cell_value = self.cell_value(row, col)
-                        w = width_col
-                        if col == 0:
-                            w = width_row
-                        fill = self.colors.get("light")
-                        if row > 0 and col > 0:
-                            if cell_value in self.roles:
-                                index = self.roles.index(cell_value)
-                                if index < len(self.styles):
-                                    fill = self.colors.get(self.styles[index])
-                        text_y = y+h-6
-                        text_x = x+(w/2)
-                        text_a = "middle"
-                        text_weight = "normal"
-                        if col == 0:
-                            text_x = x+3
-                            text_a = "start"
-                        if col==0 and row==0:
-                            text_weight = "bold"
-                        f.write(f'  <rect x="{x}" y="{y}" width="{w}" height="{h}" fill="{fill}" stroke="#ffffff" stroke-width="2" />\n')
-                        f.write(f'  <text x="{text_x}" y="{text_y}" font-size="{font_size}" font-family="Arial, Helvetica, sans-serif" text-anchor="{text_a}" font-weight="{text_weight}" fill="#000000">{cell_value}</text>\n')
-                        x += w
-                    y += h
-                if False:
-                    f.write( '<html xmlns="http://www.w3.org/1999/xhtml">\n')
-                    f.write( '  <head>\n')
-                    f.write(f'    <title>{self.cell_value(0,0)}</title>\n')
-                    f.write(f'    <meta name="description" content="{self.cell_value(0,0)}" />\n')
-                    f.write(f'    <meta name="generator"   content="{self.title} {self.version}" />\n')
-                    f.write(f'    <link rel="help"         href="https://github.com/marjohloo/RACI" />\n')
-                    f.write(f'    <link rel="author"       href="https://github.com/marjohloo" />\n')
-                    f.write(f'    <link rel="license"      href="https://www.gnu.org/licenses/gpl-3.0.html" />\n')
-                    f.write( '    <style>\n')
-                    f.write( '        body              { font-size: 10pt; font-family: Calibri,Arial,Helvetica,sans-serif; }\n')
-                    f.write( '        div               { page-break-inside: avoid; }\n')
-                    f.write( '        p                 { font-size: 10pt; }\n')
-                    f.write( '        h1                { font-size: 16pt; font-weight: bold; }\n')
-                    f.write( '        h2                { font-size: 12pt; font-weight: bold; /* page-break-before: always; */ }\n')
-                    f.write( '        table, tr, th, td { font-size: 10pt; text-align: center; vertical-align: top; border: 1px solid black; border-collapse: collapse; padding: 2pt}\n')
-                    f.write( '        .page             { page-break-before: always; }\n')
-                    f.write( '        .left             { text-align: left; }\n')
-                    f.write(f'        .primary          {{ background: {self.colors.get("primary")}; }}\n')
-                    f.write(f'        .secondary        {{ background: {self.colors.get("secondary")}; }}\n')
-                    f.write(f'        .success          {{ background: {self.colors.get("success")}; }}\n')
-                    f.write(f'        .warning          {{ background: {self.colors.get("warning")}; }}\n')
-                    f.write(f'        .primary          {{ background: {self.colors.get("primary")}; }}\n')
-                    f.write(f'        .danger           {{ background: {self.colors.get("danger")}; }}\n')
-                    f.write(f'        .info             {{ background: {self.colors.get("info")}; }}\n')
-                    f.write( '    </style>\n')
-                    f.write( '  </head>\n')
-                    # Calculate column width percentage
-                    col_width = int(100/(self.cols+1))
-                    # Begin body
-                    f.write( '  <body>\n')
-                    f.write( '    <div>\n')
-                    f.write(f'      <h1>{self.cell_value(0,0)}</h1>\n')
-                    # Output table data
-                    f.write('      <table id="RACI" width="100%">\n')
-                    for row in range(self.rows):
-                        f.write('        <tr>\n')
-                        for col in range(self.cols):
-                            if row == 0 and col == 0:
-                                f.write('          <th></th>\n')
-                            else:
-                                f.write(f'          {self.cell_html(row, col, 0)}\n')
-                        f.write('        </tr>\n')
-                    f.write('      </table>\n')
-                    f.write('    </div>\n')
-                    # Output individual data
-                    if False:
-                        for col in range(1, self.cols):
-                            if col == 1:
-                                f.write('    <div class="page">\n')
-                            else:
-                                f.write('    <div>\n')
-                            f.write(f'      <h2>{self.cell_value(0,0)}: {self.cell_value(0, col)}</h2>\n')
-                            f.write( '      <table width="100%">\n')
-                            for row in range(1, self.rows):
-                                f.write( '        <tr>\n')
-                                f.write(f'          {self.cell_html(row, 0,   1)}\n')
-                                f.write(f'          {self.cell_html(row, col, 1)}\n')
-                                f.write( '        </tr>\n')
-                            f.write( '      </table>\n')
-                            f.write('    </div>\n')
-                    # End file
-                    f.write('  </body>\n')
-
-
-                f.write('</svg>\n')
-                f.close()
-                # Retain filename
-                #self.filename_set(filename)
-                # Data is saved
-                #self.saved = True
+            self.matrix().write_svg(filename, self.metrics)
 
+    @Perf.timed("file_write_excel")
     def file_write_excel(self, filename):
         if len(filename) > 0:
-            # Open file
-            with xlsxwriter.Workbook(filename) as w:
-                # Get widths from biggest row/column titles
-                width_row = 12
-                width_col = 12
-                for row in range(self.rows):
-                    if len(self.cell_value(row, 0)) > width_row:
-                        width_row = len(self.cell_value(row, 0))
-                for col in range(1,self.cols):
-                    if len(self.cell_value(0, col)) > width_col:
-                        width_col = len(self.cell_value(0, col))
-                # Set formats
-                format_normal    = w.add_format()
-                format_bold      = w.add_format({"bold" : 1})
-                #format_primary   = w.add_format({"bg_color" : self.colors.get("primary")})
-                #format_secondary = w.add_format({"bg_color" : self.colors.get("secondary")})
-                #format_success   = w.add_format({"bg_color" : self.colors.get("success")})
-                #format_warning   = w.add_format({"bg_color" : self.colors.get("warning")})
-                #format_danger    = w.add_format({"bg_color" : self.colors.get("danger")})
-                #format_info      = w.add_format({"bg_color" : self.colors.get("info")})
-                format_data      = []
-                for style in self.styles:
-                    format_data.append(w.add_format({"bg_color" : self.colors.get(style)}))
-                # Create worksheet
-                worksheet = w.add_worksheet(self.cell_value(0,0))
-                # Loop through cells
-                for row in range(self.rows):
-                    for col in range(self.cols):
-                        # Set cell data
-                        if row > 0 and col > 0:
-                            worksheet.write(row, col, self.cell_value(row, col))
-                        else:
-                            worksheet.write(row, col, self.cell_value(row, col), format_bold)
-                # Set column widths
-                worksheet.set_column(0, 0,           width_row)
-                worksheet.set_column(1, self.cols-1, width_col)
-                for index in range(len(self.roles)):
-                    if index < len(format_data):
-                        role_quotes = f'"{self.roles[index]}"'
-                        worksheet.conditional_format(1, 1, self.rows-1, self.cols-1, {"type"     : "cell",
-                                                                                      "criteria" : "==",
-                                                                                      "value"    : role_quotes,
-                                                                                      "format"   : format_data[index]})
+            self.matrix().write_excel(filename, self.metrics)
 
     def filename_set(self, filename):
         # Retain filename
         self.filename = filename
+        # Editing a workbook ?
+        if self.book != None:
+            book_name = "Workbook"
+            if self.book.filename != "":
+                book_name = os.path.basename(self.book.filename)
+            self.window.title(f'{self.title} - {book_name} - {self.cell_value(0, 0)}')
+            self.menu.entryconfigure("View HTML...",  state=DISABLED)
+            self.menu.entryconfigure("View Excel...", state=NORMAL if self.book.filename != "" else DISABLED)
         # Got a filename ?
-        if len(self.filename):
+        elif len(self.filename):
             self.window.title(f'{self.title} - {os.path.basename(self.filename)}')
             self.menu.entryconfigure("View HTML...",  state=NORMAL)
             self.menu.entryconfigure("View Excel...", state=NORMAL)
@@ -575,16 +757,44 @@ class Raci:
             self.menu.entryconfigure("View HTML...",  state=DISABLED)
             self.menu.entryconfigure("View Excel...", state=DISABLED)
 
+    def style_name(self, widget, bootstyle):
+        # ttk style for a bootstyle, built once and then shared by all cells
+        key = (widget, bootstyle)
+        name = self.style_cache.get(key)
+        if name == None:
+            probe = widget(self.window, bootstyle=bootstyle)
+            name = probe.cget("style")
+            probe.destroy()
+            self.style_cache[key] = name
+        return name
+
+    def style_cache_build(self):
+        self.style_cache = {}
+        self.role_styles_build()
+        for style in ("primary", "danger", "info", "success", "success-outline"):
+            self.style_name(ttk.Button, style)
+        for style in ("primary", "info", "dark", "success", "warning"):
+            self.style_name(ttk.Entry, style)
+
+    def role_styles_build(self):
+        # Styles of the data buttons by role id
+        self.role_styles         = [self.style_name(ttk.Button, style)              for style in self.scheme.styles]
+        self.role_styles_outline = [self.style_name(ttk.Button, f'{style}-outline') for style in self.scheme.styles]
+
+    @Perf.timed("view_toggle")
     def view_toggle(self):
         if self.view == "min":
             self.view = "max"
         else:
             self.view = "min"
-        for cell_key in sorted(self.cells):
-            cell = self.cells[cell_key]
-            if cell.row == 0 or cell.col == 0:
-                cell.view()
-
+        # Only the header cells have controls to show or hide
+        self.cells[Cell.key(0, 0)].view()
+        for row in range(1, self.rows):
+            self.cells[Cell.key(row, 0)].view()
+        for col in range(1, self.cols):
+            self.cells[Cell.key(0, col)].view()
+
+    @Perf.timed("row_add")
     def row_add(self):
         row = self.rows
         for col in range(self.cols):
@@ -603,6 +813,7 @@ class Raci:
             if cell_key in self.cells:
                 self.cells[cell_key].grid()
 
+    @Perf.timed("col_add")
     def col_add(self):
         col = self.cols
         for row in range(self.rows):
@@ -621,6 +832,7 @@ class Raci:
             if cell_key in self.cells:
                 self.cells[cell_key].grid()
 
+    @Perf.timed("row_del")
     def row_del(self, row):
         if row > 0 and row < self.rows:
             for col in range(self.cols):
@@ -640,6 +852,7 @@ class Raci:
             if cell_key in self.cells:
                 self.cells[cell_key].grid()
 
+    @Perf.timed("col_del")
     def col_del(self, col):
         if col > 0 and col < self.cols:
             for row in range(self.rows):
@@ -659,6 +872,7 @@ class Raci:
             if cell_key in self.cells:
                 self.cells[cell_key].grid()
 
+    @Perf.timed("row_swap")
     def row_swap(self, row_a, row_b):
         if row_a > 0 and row_a < self.rows and row_b > 0 and row_b < self.rows and row_a != row_b:
             for col in range(self.cols):
@@ -672,6 +886,7 @@ class Raci:
                     self.cells[cell_key_b] = cell_a
                     self.cells[cell_key_a] = cell_b
 
+    @Perf.timed("col_swap")
     def col_swap(self, col_a, col_b):
         if col_a > 0 and col_a < self.cols and col_b > 0 and col_b < self.cols and col_a != col_b:
             for row in range(self.rows):
@@ -691,9 +906,18 @@ class Raci:
             os.startfile(self.filename, 'open')
 
     def file_view_excel(self):
-        if self.filename != "":
+        if self.book != None and self.book.filename != "":
+            os.startfile(Book.excel_name(self.book.filename), 'open')
+        elif self.filename != "":
             # Open file in browser
             os.startfile(self.filename.replace(".html", ".xlsx"), 'open')
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="RACI responsibility assignment matrix editor")
+    parser.add_argument("--perf", action="store_true", help="Time operations, see File > Performance...")
+    parser.add_argument("--log",  default="WARNING", help="Logging level, e.g. DEBUG")
+    args = parser.parse_args()
+    logging.basicConfig(level=getattr(logging, args.log.upper(), logging.WARNING))
+    if args.perf:
+        Perf.enabled = True
     raci = Raci()
\ No newline at end of file
@@ -0,0 +1,148 @@
+########################################################################
+#
+# RACI
+#
+# A tool to create RACI responsibility assignment matricies.
+#
+# https://github.com/marjohloo/RACI
+#
+# Copyright 2022 Martin Looker
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################
+
+# Package imports
+import json
+import os
+from   collections import OrderedDict
+
+# Schemes are read from schemes.json next to this file, then from
+# ~/.raci_schemes.json which may add schemes or replace bundled ones. Each
+# maps a scheme name to its roles in order, with the style for each role:
+#
+#   {"DACI" : {"Driver" : "danger", "Approver" : "warning", ...}}
+#
+# Styles are the theme colors in COLORS, roles with any other style use the
+# blank style. Role names must not contain "|" or ":" as charts store their
+# scheme as
+#
+#   <meta name="scheme" content="DACI|Driver:danger|Approver:warning|..." />
+
+SCHEME_DEFAULT = "RACI"
+SCHEME_FILES   = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemes.json"),
+                  os.path.join(os.path.expanduser("~"), ".raci_schemes.json")]
+SCHEME_BLANK   = "secondary"
+# Colors of the default ttkbootstrap theme, used when there is no window
+COLORS         = {
+    "primary"   : "#4582ec",
+    "secondary" : "#adb5bd",
+    "success"   : "#02b875",
+    "info"      : "#17a2b8",
+    "warning"   : "#f0ad4e",
+    "danger"    : "#d9534f",
+    "light"     : "#F8F9FA",
+    "dark"      : "#343a40"
+}
+
+class Scheme:
+
+    schemes = None
+
+    # Roles are interned as small integer ids, id 0 is the blank role used for
+    # empty or unknown values, the tables are indexed by id
+    def __init__(self, name, roles):
+        self.name   = name
+        self.roles  = [""]
+        self.styles = [SCHEME_BLANK]
+        for role, style in roles.items():
+            if role != "" and role not in self.roles:
+                if style not in COLORS:
+                    style = SCHEME_BLANK
+                self.roles.append(role)
+                self.styles.append(style)
+        self.ids    = {role: index for index, role in enumerate(self.roles)}
+        # Text accepted for each role when importing, the name ignoring case
+        # or the initial when no other role shares it
+        self.aliases = {}
+        initials = {}
+        for role in self.roles[1:]:
+            initials.setdefault(role[:1].lower(), []).append(role)
+        for initial, roles in initials.items():
+            if len(roles) == 1:
+                self.aliases[initial] = roles[0]
+        for role in self.roles[1:]:
+            self.aliases[role.lower()] = role
+
+    def id(self, value):
+        return self.ids.get(value, 0)
+
+    def style(self, value):
+        return self.styles[self.ids.get(value, 0)]
+
+    def match(self, text):
+        # Role for imported text, text that is not a role is kept
+        return self.aliases.get(text.lower(), text)
+
+    def next(self, value):
+        # Id of the role after value, as cycled by clicking a cell
+        index = self.ids.get(value)
+        if index == None:
+            return 0
+        index += 1
+        if index >= len(self.roles):
+            index = 0
+        return index
+
+    def text(self):
+        return "|".join([self.name] + [f'{role}:{style}' for role, style in zip(self.roles[1:], self.styles[1:])])
+
+    def parse(text):
+        # Scheme stored in a chart, None if not valid
+        parts = text.split("|")
+        roles = OrderedDict()
+        for part in parts[1:]:
+            if ":" not in part:
+                return None
+            role, style = part.rsplit(":", 1)
+            roles[role] = style
+        if parts[0] == "" or len(roles) == 0:
+            return None
+        return Scheme(parts[0], roles)
+
+    def load(filenames=SCHEME_FILES):
+        # All configured schemes by name, RACI is always present
+        schemes = OrderedDict()
+        schemes[SCHEME_DEFAULT] = Scheme(SCHEME_DEFAULT, OrderedDict([("Responsible", "danger"),
+                                                                      ("Accountable", "warning"),
+                                                                      ("Consulted",   "info"),
+                                                                      ("Informed",    "success")]))
+        for filename in filenames:
+            if os.path.isfile(filename):
+                try:
+                    with open(filename, "r") as f:
+                        config = json.load(f, object_pairs_hook=OrderedDict)
+                    for name, roles in config.items():
+                        schemes[name] = Scheme(name, roles)
+                except (OSError, ValueError, AttributeError):
+                    pass
+        return schemes
+
+    def get(name=SCHEME_DEFAULT):
+        # Configured scheme by name, loaded once, RACI if not known
+        if Scheme.schemes == None:
+            Scheme.schemes = Scheme.load()
+        if name in Scheme.schemes:
+            return Scheme.schemes[name]
+        return Scheme.schemes[SCHEME_DEFAULT]
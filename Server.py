@@ -0,0 +1,314 @@
+########################################################################
+#
+# RACI
+#
+# A tool to create RACI responsibility assignment matricies.
+#
+# https://github.com/marjohloo/RACI
+#
+# Copyright 2022 Martin Looker
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################
+
+# Package imports
+import argparse
+import io
+import json
+import os
+import sys
+import threading
+from   collections        import OrderedDict
+from   concurrent.futures import ThreadPoolExecutor
+from   http.server        import BaseHTTPRequestHandler, HTTPServer
+from   urllib.parse       import parse_qs, urlparse
+
+# Project imports
+from Matrix import *
+
+# Serves rendered charts over HTTP:
+#
+#   GET  /render?path=coffee.html&format=svg   renders a file below the root
+#   POST /render?format=svg                    renders an uploaded .html file
+#                                              or JSON {"title": ..., "scheme": ..., "data": [[...]]}
+#                                              (all values strings)
+#
+# Rendered files are cached by content digest and format, the digest is also
+# the ETag so clients revalidating with If-None-Match get 304 Not Modified.
+
+FORMATS = {
+    "svg"  : "image/svg+xml; charset=utf-8",
+    "html" : "text/html; charset=utf-8",
+    "xlsx" : "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+SERVER_CACHE   = 256
+SERVER_THREADS = 8
+SERVER_UPLOAD  = 16 * 1024 * 1024
+
+class Cache:
+
+    # Thread safe LRU of rendered files
+    def __init__(self, size=SERVER_CACHE):
+        self.size  = size
+        self.items = OrderedDict()
+        self.lock  = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.items.get(key)
+            if value is not None:
+                self.items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+class Server(HTTPServer):
+
+    def __init__(self, address, root=".", cache=SERVER_CACHE, threads=SERVER_THREADS):
+        self.root    = os.path.realpath(root)
+        self.cache   = Cache(cache)
+        # Digests of files by path, valid while size and mtime are unchanged
+        self.files   = Cache(cache * 4)
+        self.metrics = Metrics()
+        # Requests for the same chart and format wait for one render, other
+        # renders run in parallel. Locks by (digest, format) with their users.
+        self.render_locks = {}
+        self.render_locks_lock = threading.Lock()
+        self.pool    = ThreadPoolExecutor(max_workers=threads)
+        HTTPServer.__init__(self, address, Handler)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_pool, request, client_address)
+
+    def process_request_pool(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        HTTPServer.server_close(self)
+        self.pool.shutdown(wait=True)
+        self.metrics.save()
+
+    def path_resolve(self, path):
+        # Files outside the root are never served
+        path = os.path.realpath(os.path.join(self.root, path))
+        try:
+            if os.path.commonpath([self.root, path]) != self.root:
+                return None
+        except ValueError:
+            # On another drive
+            return None
+        return path
+
+    def path_read(self, path):
+        # Matrix in a file, None if missing, unreadable or not a chart
+        try:
+            return Matrix.read(path)
+        except (OSError, ValueError):
+            return None
+
+    def path_matrix(self, path, reread=False):
+        # Returns (digest, matrix) for a file, matrix is only read when the
+        # file has changed since it was last seen (or reread is set)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None, None
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        known = self.files.get(path)
+        if known is not None and known[0] == stamp and not reread:
+            return known[1], None
+        matrix = self.path_read(path)
+        if matrix == None:
+            return None, None
+        digest = matrix.digest()
+        self.files.put(path, (stamp, digest))
+        return digest, matrix
+
+    def render(self, digest, format, matrix_get):
+        # Rendered file, None if matrix_get no longer has this content
+        key = (digest, format)
+        body = self.cache.get(key)
+        if body is None:
+            with self.render_locks_lock:
+                entry = self.render_locks.setdefault(key, [threading.Lock(), 0])
+                entry[1] += 1
+            try:
+                with entry[0]:
+                    body = self.cache.get(key)
+                    if body is None:
+                        matrix = matrix_get()
+                        if matrix == None:
+                            return None
+                        if format == "svg":
+                            body = matrix.svg(self.metrics).encode("utf-8")
+                        elif format == "xlsx":
+                            output = io.BytesIO()
+                            matrix.excel(output, self.metrics)
+                            body = output.getvalue()
+                        else:
+                            body = matrix.html().encode("utf-8")
+                        self.cache.put(key, body)
+            finally:
+                with self.render_locks_lock:
+                    entry[1] -= 1
+                    if entry[1] == 0:
+                        del self.render_locks[key]
+        return body
+
+class Handler(BaseHTTPRequestHandler):
+
+    server_version = "RACI"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/render":
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+        format = query.get("format", ["svg"])[0]
+        if format not in FORMATS:
+            self.send_error(400, "Unknown format")
+            return
+        if "path" not in query:
+            self.send_error(400, "Missing path")
+            return
+        path = self.server.path_resolve(query["path"][0])
+        if path == None:
+            self.send_error(403)
+            return
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        # A file replaced after its digest was taken is read again, so the
+        # content rendered always matches the ETag
+        for reread in (False, True):
+            digest, matrix = self.server.path_matrix(path, reread)
+            if digest == None:
+                self.send_error(422, "RACI data not found")
+                return
+            def matrix_get():
+                if matrix != None:
+                    return matrix
+                matrix_now = self.server.path_read(path)
+                if matrix_now == None or matrix_now.digest() != digest:
+                    return None
+                return matrix_now
+            if self.respond(digest, format, matrix_get):
+                return
+        self.send_error(409, "Chart changed while rendering")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/render":
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+        format = query.get("format", ["svg"])[0]
+        if format not in FORMATS:
+            self.send_error(400, "Unknown format")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            self.send_error(400, "Bad Content-Length")
+            return
+        if length <= 0 or length > SERVER_UPLOAD:
+            self.send_error(413 if length > 0 else 400)
+            return
+        body = self.rfile.read(length).decode("utf-8", errors="replace")
+        matrix = None
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                matrix = Handler.matrix_json(json.loads(body))
+            except ValueError:
+                matrix = None
+        else:
+            try:
+                matrix = Matrix.parse(body.splitlines(keepends=True))
+            except (ValueError, IndexError):
+                matrix = None
+        if matrix == None:
+            self.send_error(422, "RACI data not found")
+            return
+        self.respond(matrix.digest(), format, lambda: matrix)
+
+    def matrix_json(upload):
+        # Matrix from an uploaded {"title": ..., "scheme": ..., "data": [[...]]}
+        # or None if it is not in that shape
+        if not isinstance(upload, dict):
+            return None
+        title  = upload.get("title", "TITLE")
+        scheme = upload.get("scheme", SCHEME_DEFAULT)
+        data   = upload.get("data", [])
+        if not isinstance(title, str) or not isinstance(scheme, str) or not isinstance(data, list):
+            return None
+        for values in data:
+            if not isinstance(values, list) or len(values) == 0:
+                return None
+            for value in values:
+                if not isinstance(value, str):
+                    return None
+        return Matrix(title, data, Scheme.get(scheme))
+
+    def respond(self, digest, format, matrix_get):
+        # Returns False without responding if the chart could not be rendered
+        etag = f'"{digest}-{format}"'
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return True
+        body = self.server.render(digest, format, matrix_get)
+        if body == None:
+            return False
+        self.send_response(200)
+        self.send_header("Content-Type", FORMATS[format])
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve rendered RACI charts over HTTP")
+    parser.add_argument("--host",    default="127.0.0.1")
+    parser.add_argument("--port",    default=8080, type=int)
+    parser.add_argument("--root",    default=".", help="Folder of .html files that may be rendered")
+    parser.add_argument("--cache",   default=SERVER_CACHE, type=int, help="Rendered files to keep")
+    parser.add_argument("--threads", default=SERVER_THREADS, type=int)
+    args = parser.parse_args(argv)
+    server = Server((args.host, args.port), args.root, args.cache, args.threads)
+    print(f'Serving {server.root} on http://{args.host}:{args.port}/render')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+########################################################################
+#
+# RACI
+#
+# A tool to create RACI responsibility assignment matricies.
+#
+# https://github.com/marjohloo/RACI
+#
+# Copyright 2022 Martin Looker
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################
+
+# Package imports
+import re
+
+# Project imports
+from Matrix import *
+
+# Read only projections of a Matrix. A view keeps lists of the underlying
+# row and column indices and reads cells through them, so the cells are
+# never copied. Views can be exported, saved, compared or loaded into the
+# window like any Matrix, but not changed.
+
+class View(Matrix):
+
+    # row_map and col_map hold the underlying indices for each row and
+    # column of the view, when transposed row_map indexes underlying columns
+    def __init__(self, matrix, row_map, col_map, transpose=False, title=None, roles=None):
+        self.matrix    = matrix
+        self.row_map   = row_map
+        self.col_map   = col_map
+        self.transpose = transpose
+        self.title     = title
+        # Data cells with other roles read as blank
+        self.roles_shown = roles
+
+    @property
+    def rows(self):
+        return len(self.row_map)
+
+    @property
+    def cols(self):
+        return len(self.col_map)
+
+    @property
+    def scheme(self):
+        return self.matrix.scheme
+
+    @property
+    def colors(self):
+        return self.matrix.colors
+
+    def value(self, row, col):
+        if row == 0 and col == 0 and self.title != None:
+            return self.title
+        if self.transpose:
+            value = self.matrix.value(self.col_map[col], self.row_map[row])
+        else:
+            value = self.matrix.value(self.row_map[row], self.col_map[col])
+        if self.roles_shown != None and row > 0 and col > 0 and value not in self.roles_shown:
+            value = ""
+        return value
+
+    def paste(self, block, row=0, col=0):
+        raise TypeError("a View is read only, paste into the Matrix it views")
+
+    def hash(self):
+        content = 0
+        for row in range(self.rows):
+            for col in range(self.cols):
+                content ^= Hash.cell(row, col, self.value(row, col))
+        return content
+
+class Transpose(View):
+
+    # Rows become columns and columns rows
+    def __init__(self, matrix):
+        View.__init__(self, matrix, list(range(matrix.cols)), list(range(matrix.rows)), transpose=True)
+
+class Person(View):
+
+    # The row titles and one column, with assigned only rows holding a role
+    def __init__(self, matrix, col, assigned=False):
+        rows = [0]
+        for row in range(1, matrix.rows):
+            if not assigned or matrix.scheme.id(matrix.value(row, col)) != 0:
+                rows.append(row)
+        View.__init__(self, matrix, rows, [0, col], title=f'{matrix.value(0, 0)} - {matrix.value(0, col)}')
+        self.person = matrix.value(0, col)
+
+class Role(View):
+
+    # Only the rows and columns holding one of roles, other roles read blank
+    def __init__(self, matrix, roles):
+        roles = set(roles)
+        rows_found = set()
+        cols_found = set()
+        for row in range(1, matrix.rows):
+            for col in range(1, matrix.cols):
+                if matrix.value(row, col) in roles:
+                    rows_found.add(row)
+                    cols_found.add(col)
+        names = [role for role in matrix.scheme.roles if role in roles]
+        View.__init__(self, matrix, [0] + sorted(rows_found), [0] + sorted(cols_found),
+                      title=f'{matrix.value(0, 0)} - {", ".join(names)}', roles=roles)
+
+def filename_safe(text):
+    # Text usable as a file name on Windows and elsewhere
+    text = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", text).strip(" .")
+    if text == "":
+        text = "_"
+    return text
@@ -0,0 +1,168 @@
+########################################################################
+#
+# RACI
+#
+# A tool to create RACI responsibility assignment matricies.
+#
+# https://github.com/marjohloo/RACI
+#
+# Copyright 2022 Martin Looker
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################
+
+# Package imports
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from   concurrent.futures import ThreadPoolExecutor
+
+# Project imports
+from Matrix import *
+
+# Keeps the .svg and .xlsx files of every chart in a folder up to date:
+#
+#   python Watch.py charts
+#
+# The folder is polled, which works the same on local disks and network
+# shares. A changed .html file is only exported once it has stopped changing
+# for the debounce time, and outputs already holding the chart's content
+# (according to the .hash file written on save) are left alone.
+
+WATCH_INTERVAL = 1.0
+WATCH_DEBOUNCE = 2.0
+WATCH_WORKERS  = 4
+
+class Watch:
+
+    def __init__(self, folder, recursive=False, debounce=WATCH_DEBOUNCE, workers=WATCH_WORKERS):
+        self.folder    = folder
+        self.recursive = recursive
+        self.debounce  = debounce
+        self.metrics   = Metrics()
+        self.pool      = ThreadPoolExecutor(max_workers=workers)
+        self.lock      = threading.Lock()
+        # Last seen (size, mtime) of each chart
+        self.known     = {}
+        # Changed charts waiting to settle, path -> (stamp, time last changed)
+        self.pending   = {}
+        # Charts being exported, and those changed again meanwhile
+        self.running   = set()
+        self.again     = set()
+
+    def scan(self):
+        # Stamps of all .html files in the folder
+        stamps = {}
+        folders = [self.folder]
+        while len(folders):
+            folder = folders.pop()
+            try:
+                entries = list(os.scandir(folder))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if self.recursive:
+                            folders.append(entry.path)
+                    elif entry.name.lower().endswith(".html"):
+                        stat = entry.stat()
+                        stamps[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    pass
+        return stamps
+
+    def poll(self):
+        # Queues charts that changed and have since settled, returns the
+        # number queued
+        now = time.monotonic()
+        stamps = self.scan()
+        for path, stamp in stamps.items():
+            if self.known.get(path) != stamp:
+                self.known[path] = stamp
+                self.pending[path] = (stamp, now)
+        for path in list(self.known):
+            if path not in stamps:
+                del self.known[path]
+                self.pending.pop(path, None)
+        queued = 0
+        for path, (stamp, changed) in list(self.pending.items()):
+            if now - changed >= self.debounce:
+                del self.pending[path]
+                with self.lock:
+                    if path in self.running:
+                        self.again.add(path)
+                        continue
+                    self.running.add(path)
+                self.pool.submit(self.export, path)
+                queued += 1
+        return queued
+
+    def export(self, path):
+        try:
+            matrix = Matrix.read(path)
+            if matrix == None:
+                log.debug('%s: RACI data not found', path)
+            else:
+                targets = Matrix.targets(path)[1:]
+                written = matrix.save(path, GENERATOR, self.metrics, targets=targets)
+                for target in written:
+                    log.info('Wrote %s', target)
+        except Exception:
+            log.exception('%s: export failed', path)
+        finally:
+            with self.lock:
+                self.running.discard(path)
+                if path in self.again:
+                    # Changed while exporting, check it again once settled
+                    self.again.discard(path)
+                    self.known.pop(path, None)
+
+    def run(self, interval=WATCH_INTERVAL, once=False):
+        try:
+            while True:
+                self.poll()
+                if once and len(self.pending) == 0:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.pool.shutdown(wait=True)
+            self.metrics.save()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-export RACI charts in a folder when they change")
+    parser.add_argument("folder")
+    parser.add_argument("--recursive", action="store_true", help="Also watch sub-folders")
+    parser.add_argument("--interval",  default=WATCH_INTERVAL, type=float, help="Seconds between polls")
+    parser.add_argument("--debounce",  default=WATCH_DEBOUNCE, type=float, help="Seconds a file must be unchanged before exporting")
+    parser.add_argument("--workers",   default=WATCH_WORKERS,  type=int)
+    parser.add_argument("--once",      action="store_true", help="Export out of date charts then exit")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    debounce = args.debounce
+    if args.once:
+        debounce = 0
+    watch = Watch(args.folder, args.recursive, debounce, args.workers)
+    log.info('Watching %s', os.path.abspath(args.folder))
+    watch.run(args.interval, args.once)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
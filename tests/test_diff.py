@@ -0,0 +1,96 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Diff import *
+
+def chart(data):
+    return Matrix("TITLE", [["TITLE"] + data[0]] + [[title] + values for title, values in data[1:]])
+
+BASE = [["P", "Q"],
+        ("r1", ["Responsible", "Informed"]),
+        ("r2", ["Accountable", "Consulted"])]
+
+class TestMerge(unittest.TestCase):
+
+    def test_column_removed_by_theirs_changed_by_ours(self):
+        ours   = chart([["P", "Q"],
+                        ("r1", ["Consulted",   "Informed"]),
+                        ("r2", ["Accountable", "Consulted"])])
+        theirs = chart([["Q"],
+                        ("r1", ["Informed"]),
+                        ("r2", ["Consulted"])])
+        merge = Merge(chart(BASE), ours, theirs)
+        self.assertEqual(merge.matrix.data, ours.data)
+        self.assertEqual(merge.conflicts, ["Conflict: P removed by theirs but changed by ours"])
+
+    def test_column_removed_by_ours_changed_by_theirs(self):
+        ours   = chart([["Q"],
+                        ("r1", ["Informed"]),
+                        ("r2", ["Consulted"])])
+        theirs = chart([["P", "Q"],
+                        ("r1", ["Consulted",   "Informed"]),
+                        ("r2", ["Accountable", "Consulted"])])
+        merge = Merge(chart(BASE), ours, theirs)
+        self.assertEqual(merge.matrix.data, chart([["Q", "P"],
+                                                   ("r1", ["Informed",  "Consulted"]),
+                                                   ("r2", ["Consulted", "Accountable"])]).data)
+        self.assertEqual(merge.conflicts, ["Conflict: P removed by ours but changed by theirs"])
+
+    def test_row_removed_by_theirs_changed_by_ours(self):
+        ours   = chart([["P", "Q"],
+                        ("r1", ["Responsible", "Consulted"]),
+                        ("r2", ["Accountable", "Consulted"])])
+        theirs = chart([["P", "Q"],
+                        ("r2", ["Accountable", "Consulted"])])
+        merge = Merge(chart(BASE), ours, theirs)
+        self.assertEqual(merge.matrix.data, ours.data)
+        self.assertEqual(merge.conflicts, ["Conflict: r1 removed by theirs but changed by ours"])
+
+    def test_row_removed_by_ours_changed_by_theirs(self):
+        ours   = chart([["P", "Q"],
+                        ("r2", ["Accountable", "Consulted"])])
+        theirs = chart([["P", "Q"],
+                        ("r1", ["Responsible", "Consulted"]),
+                        ("r2", ["Accountable", "Consulted"])])
+        merge = Merge(chart(BASE), ours, theirs)
+        self.assertEqual(merge.matrix.data, chart([["P", "Q"],
+                                                   ("r2", ["Accountable", "Consulted"]),
+                                                   ("r1", ["Responsible", "Consulted"])]).data)
+        self.assertEqual(merge.conflicts, ["Conflict: r1 removed by ours but changed by theirs"])
+
+    def test_unchanged_removal_is_merged(self):
+        theirs = chart([["Q"],
+                        ("r1", ["Informed"]),
+                        ("r2", ["Consulted"])])
+        merge = Merge(chart(BASE), chart(BASE), theirs)
+        self.assertEqual(merge.matrix.data, theirs.data)
+        self.assertEqual(merge.conflicts, [])
+
+    def test_cell_conflict_keeps_ours(self):
+        ours   = chart([["P", "Q"],
+                        ("r1", ["Consulted",   "Informed"]),
+                        ("r2", ["Accountable", "Consulted"])])
+        theirs = chart([["P", "Q"],
+                        ("r1", ["Informed",    "Informed"]),
+                        ("r2", ["Accountable", "Consulted"])])
+        merge = Merge(chart(BASE), ours, theirs)
+        self.assertEqual(merge.matrix.data, ours.data)
+        self.assertEqual(merge.conflicts, ['Conflict: r1 / P: ours "Consulted", theirs "Informed"'])
+
+class TestDiff(unittest.TestCase):
+
+    def test_moved_and_changed(self):
+        b = chart([["Q", "P"],
+                   ("r2", ["Consulted", "Accountable"]),
+                   ("r1", ["Informed",  "Informed"])])
+        diff = Diff(chart(BASE), b)
+        self.assertEqual(len(diff.rows_moved), 1)
+        self.assertEqual(len(diff.cols_moved), 1)
+        self.assertEqual(diff.cells, [(("r1", 0), ("P", 0), "Responsible", "Informed")])
+        self.assertTrue(Diff(chart(BASE), chart(BASE)).empty())
+
+if __name__ == '__main__':
+    unittest.main()